@@ -0,0 +1,147 @@
+# backends.py
+# 추론 백엔드: fastai Learner / TorchScript / ONNX Runtime 을 같은 인터페이스로 감쌈
+#   backend.vocab, backend.input_size, backend.predict(pil), backend.predict_batch(pils, bs)
+# TorchScript/ONNX 아티팩트는 export_model.py 로 model.pkl 옆에 생성:
+#   model.pt / model.int8.pt / model.onnx / model.int8.onnx + model.meta.json
+import os, json
+import numpy as np
+from PIL import Image
+from imaging import model_input_size
+
+BACKENDS = ("fastai", "torchscript", "torchscript-int8", "onnx", "onnx-int8")
+_ARTIFACT_SUFFIX = {
+    "torchscript": ".pt", "torchscript-int8": ".int8.pt",
+    "onnx": ".onnx", "onnx-int8": ".int8.onnx",
+}
+
+def artifact_path(model_path: str, kind: str) -> str:
+    if kind == "fastai": return model_path
+    return os.path.splitext(model_path)[0] + _ARTIFACT_SUFFIX[kind]
+
+def meta_path(model_path: str) -> str:
+    return os.path.splitext(model_path)[0] + ".meta.json"
+
+def resize_for_model(pil: Image.Image, size: tuple[int, int], method: str = "crop") -> Image.Image:
+    """fastai Resize(검증 시)와 같은 방식: crop 은 중앙에서 목표 비율로 자른 뒤 리사이즈, squish 는 그대로 리사이즈."""
+    h, w = size
+    if method == "crop":
+        W, H = pil.size
+        scale = min(W / w, H / h)
+        cw, ch = w * scale, h * scale
+        left, top = (W - cw) / 2, (H - ch) / 2
+        return pil.resize((w, h), Image.BILINEAR, box=(left, top, left + cw, top + ch))
+    return pil.resize((w, h), Image.BILINEAR)
+
+def to_input_array(pils, size: tuple[int, int], method: str = "crop") -> np.ndarray:
+    """PIL 리스트 → (N, H, W, 3) uint8. 정규화는 내보낸 모델 안에서 처리."""
+    out = np.empty((len(pils), size[0], size[1], 3), dtype=np.uint8)
+    for i, pil in enumerate(pils):
+        out[i] = np.asarray(resize_for_model(pil, size, method))
+    return out
+
+class Backend:
+    name = "base"
+    vocab: list[str]
+    input_size: int
+
+    def predict_batch(self, pils, bs: int = 32) -> np.ndarray:
+        """(N, C) 확률 배열."""
+        raise NotImplementedError
+
+    def predict(self, pil):
+        """learner.predict 와 같은 (pred, pred_idx, probs) 형태 (텐서 없음)."""
+        probs = tuple(float(p) for p in self.predict_batch([pil])[0])
+        i = int(np.argmax(probs))
+        return self.vocab[i], i, probs
+
+    def warmup(self, n: int = 1):
+        """더미 이미지로 forward pass 를 미리 돌려 첫 요청의 JIT/할당 비용을 없앰."""
+        dummy = Image.new("RGB", (self.input_size, self.input_size))
+        self.predict_batch([dummy] * n, bs=n)
+
+class FastaiBackend(Backend):
+    name = "fastai"
+
+    def __init__(self, learner):
+        self.learner = learner
+        self.vocab = [str(x) for x in learner.dls.vocab]
+        self.input_size = model_input_size(learner)
+
+    def predict_batch(self, pils, bs: int = 32) -> np.ndarray:
+        dl = self.learner.dls.test_dl(list(pils), bs=bs)
+        with self.learner.no_bar():
+            probs, _ = self.learner.get_preds(dl=dl)
+        return probs.numpy()
+
+    def predict(self, pil):
+        pred, pred_idx, probs = self.learner.predict(pil)
+        return str(pred), int(pred_idx), tuple(float(p) for p in probs)
+
+class _ExportedBackend(Backend):
+    def __init__(self, meta: dict):
+        self.vocab = [str(x) for x in meta["vocab"]]
+        self.size = tuple(meta["size"])   # (높이, 너비)
+        self.method = meta.get("resize_method", "crop")
+        self.input_size = max(self.size)
+
+    def _run(self, x: np.ndarray) -> np.ndarray:
+        raise NotImplementedError
+
+    def predict_batch(self, pils, bs: int = 32) -> np.ndarray:
+        pils = list(pils)
+        outs = [self._run(to_input_array(pils[i:i + bs], self.size, self.method))
+                for i in range(0, len(pils), bs)]
+        return np.concatenate(outs) if outs else np.empty((0, len(self.vocab)), dtype=np.float32)
+
+class TorchScriptBackend(_ExportedBackend):
+    name = "torchscript"
+
+    def __init__(self, path: str, meta: dict):
+        import torch
+        super().__init__(meta)
+        self._torch = torch
+        self.model = torch.jit.load(path, map_location="cpu").eval()
+
+    def _run(self, x):
+        with self._torch.inference_mode():
+            return self.model(self._torch.from_numpy(x)).numpy()
+
+class OnnxBackend(_ExportedBackend):
+    name = "onnx"
+
+    def __init__(self, path: str, meta: dict):
+        import onnxruntime as ort
+        super().__init__(meta)
+        self.session = ort.InferenceSession(path, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+
+    def _run(self, x):
+        return self.session.run(None, {self.input_name: x})[0]
+
+def load_backend(kind: str, model_path: str) -> Backend:
+    """kind 에 맞는 백엔드 로드. fastai 외에는 export_model.py 로 만든 아티팩트가 필요."""
+    if kind not in BACKENDS:
+        raise ValueError(f"알 수 없는 백엔드: {kind} (가능: {', '.join(BACKENDS)})")
+    if kind == "fastai":
+        from fastai.vision.all import load_learner
+        return FastaiBackend(load_learner(model_path, cpu=True))
+    path = artifact_path(model_path, kind)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"{path} 가 없습니다. `python export_model.py {model_path}` 로 먼저 내보내세요.")
+    with open(meta_path(model_path), encoding="utf-8") as fh:
+        meta = json.load(fh)
+    cls = TorchScriptBackend if kind.startswith("torchscript") else OnnxBackend
+    backend = cls(path, meta)
+    backend.name = kind
+    return backend
+
+def parity_check(reference: Backend, candidate: Backend, pils, atol: float = 1e-3) -> dict:
+    """두 백엔드의 vocab/라벨/확률 일치 여부. ok 가 False 면 불일치."""
+    ref = np.asarray(reference.predict_batch(pils))
+    got = np.asarray(candidate.predict_batch(pils))
+    max_diff = float(np.abs(ref - got).max()) if len(ref) else 0.0
+    label_match = float((ref.argmax(1) == got.argmax(1)).mean()) if len(ref) else 1.0
+    vocab_ok = list(reference.vocab) == list(candidate.vocab)
+    return {"backend": candidate.name, "n": len(ref), "vocab_ok": vocab_ok,
+            "label_match": label_match, "max_abs_diff": max_diff,
+            "ok": vocab_ok and label_match == 1.0 and max_diff <= atol}
@@ -0,0 +1,70 @@
+# batch_infer.py
+# 여러 장/zip 업로드를 배치 분류 (fastai 백엔드는 test_dl + get_preds)
+import os, zipfile
+from io import BytesIO
+from imaging import load_pil_from_bytes
+from pred_cache import image_hash
+
+IMAGE_EXTS = {".jpg", ".jpeg", ".png", ".webp", ".tiff", ".tif"}
+
+def _is_image_name(name: str) -> bool:
+    base = os.path.basename(name)
+    return bool(base) and not base.startswith(".") and os.path.splitext(base)[1].lower() in IMAGE_EXTS
+
+def iter_uploaded_images(files):
+    """업로드 파일들을 (이름, 바이트)로 펼침. zip 은 내부 이미지 항목을 하나씩 읽음."""
+    for f in files:
+        name = getattr(f, "name", "upload")
+        data = f.getvalue() if hasattr(f, "getvalue") else f
+        if name.lower().endswith(".zip"):
+            with zipfile.ZipFile(BytesIO(data)) as zf:
+                for info in zf.infolist():
+                    if info.is_dir() or "__MACOSX" in info.filename or not _is_image_name(info.filename):
+                        continue
+                    yield f"{name}/{info.filename}", zf.read(info)
+        elif _is_image_name(name):
+            yield name, data
+
+def chunked(iterable, n: int):
+    buf = []
+    for x in iterable:
+        buf.append(x)
+        if len(buf) >= n:
+            yield buf
+            buf = []
+    if buf:
+        yield buf
+
+def make_row(name: str, labels: list[str], probs) -> dict:
+    probs = [float(p) for p in probs]
+    i = max(range(len(probs)), key=probs.__getitem__)
+    row = {"파일": name, "예측 라벨": labels[i], "신뢰도": probs[i]}
+    row.update({lbl: p for lbl, p in zip(labels, probs)})
+    return row
+
+def predict_batches(backend, items, bs: int = 32, cache=None, model_id=None, min_side: int | None = None):
+    """(이름, 바이트) 이터러블을 bs 단위로 분류하고 배치마다 결과 행 리스트를 yield.
+    cache 가 주어지면 이미 예측된 이미지는 forward pass 에서 제외하고 새 결과를 캐시에 넣음.
+    min_side 는 load_pil_from_bytes 의 축소 디코딩 기준."""
+    labels = backend.vocab
+    for chunk in chunked(items, bs):
+        rows, todo = [None] * len(chunk), []
+        for j, (name, b) in enumerate(chunk):
+            key = (model_id, image_hash(b))
+            hit = cache.get(key) if cache is not None else None
+            if hit is not None:
+                rows[j] = make_row(name, labels, hit[2])
+                continue
+            try:
+                todo.append((j, key, load_pil_from_bytes(b, min_side)))
+            except Exception as e:
+                rows[j] = {"파일": name, "예측 라벨": None, "신뢰도": None, "오류": str(e)}
+        if todo:
+            probs = backend.predict_batch([pil for _, _, pil in todo], bs)
+            for (j, key, _), p in zip(todo, probs):
+                p = tuple(float(x) for x in p)
+                rows[j] = make_row(chunk[j][0], labels, p)
+                if cache is not None:
+                    i = max(range(len(p)), key=p.__getitem__)
+                    cache.put(key, (labels[i], i, p))
+        yield rows
@@ -0,0 +1,275 @@
+# bench.py
+# 오프라인 벤치마크: 바이트 → 디코드/EXIF → predict → prob_list + HTML 까지 앱과 같은 경로를 측정
+#   python bench.py                                  # 로컬 stand-in learner (네트워크 불필요), 앱과 같은 worker 경로
+#   python bench.py --mode batch --batch-size 32
+#   python bench.py --concurrency 16                 # InferenceWorker 마이크로배칭, 동시 요청 16
+#   python bench.py --mode direct                    # backend.predict 직접 (fastai 는 learner.predict, 앱은 안 씀)
+#   python bench.py --backend onnx                   # stand-in 을 export_model.py 로 내보내 측정
+#   python bench.py --model-path models/v1/model.pkl --backend torchscript
+#   python bench.py --out new.json --compare old.json --threshold 1.2
+import os, sys, json, time, argparse, platform, resource, tempfile, threading, multiprocessing
+from io import BytesIO
+import numpy as np
+from PIL import Image
+from imaging import PREVIEW_MAX_SIDE, load_pil_from_bytes, make_preview
+from render import prediction_box_html, prob_card_html, sorted_probs
+
+FORMATS = {"jpeg": "JPEG", "png": "PNG", "webp": "WEBP", "tiff": "TIFF"}
+DEFAULT_VOCAB = ["taco", "pasta", "pizza"]
+
+# ======================
+# 합성 입력
+# ======================
+def synthetic_image(w: int, h: int, seed: int = 0) -> Image.Image:
+    """그라디언트 + 노이즈 (순수 노이즈보다 실제 사진에 가까운 압축률)."""
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:h, 0:w].astype(np.float32)
+    base = np.stack([x / w * 255, y / h * 255, (x + y) / (w + h) * 255], axis=-1)
+    arr = np.clip(base + rng.normal(0, 12, base.shape), 0, 255).astype(np.uint8)
+    return Image.fromarray(arr)
+
+def encode(pil: Image.Image, fmt: str, orientation: int = 1) -> bytes:
+    exif = Image.Exif()
+    if orientation != 1: exif[0x0112] = orientation
+    buf = BytesIO()
+    kw = {"quality": 90} if fmt in ("JPEG", "WEBP") else {}
+    pil.save(buf, format=fmt, exif=exif.tobytes(), **kw)
+    return buf.getvalue()
+
+def make_inputs(formats, resolutions, orientations) -> list[dict]:
+    items = []
+    for (w, h) in resolutions:
+        pil = synthetic_image(w, h, seed=w * h)
+        for fmt in formats:
+            for o in orientations:
+                items.append({"name": f"{fmt}-{w}x{h}-o{o}", "format": fmt, "w": w, "h": h,
+                              "orientation": o, "bytes": encode(pil, FORMATS[fmt], o)})
+    return items
+
+# ======================
+# stand-in 모델
+# ======================
+def make_standin_learner(vocab, arch: str = "resnet18", size: int = 224, workdir: str | None = None):
+    """vocab 모양이 같은 로컬 Learner (사전학습 가중치 다운로드 없음)."""
+    from torch import nn
+    from fastai.vision.all import (ImageDataLoaders, Learner, Normalize, Resize, CrossEntropyLossFlat,
+                                   imagenet_stats)
+    workdir = workdir or tempfile.mkdtemp(prefix="bench-")
+    fnames, labels = [], []
+    for i, lbl in enumerate(vocab):
+        for k in range(2):
+            fn = os.path.join(workdir, f"{i}_{k}.png")
+            synthetic_image(64, 64, seed=i * 10 + k).save(fn)
+            fnames.append(fn); labels.append(lbl)
+    dls = ImageDataLoaders.from_lists(workdir, fnames, labels, valid_pct=0.34, seed=0, bs=4,
+                                      item_tfms=Resize(size), batch_tfms=Normalize.from_stats(*imagenet_stats))
+    if arch == "tiny":
+        model = nn.Sequential(nn.Conv2d(3, 16, 3, 2, 1), nn.ReLU(), nn.Conv2d(16, 32, 3, 2, 1), nn.ReLU(),
+                              nn.AdaptiveAvgPool2d(1), nn.Flatten(), nn.Linear(32, len(vocab)))
+    else:
+        import torchvision.models as tvm
+        model = getattr(tvm, arch)(weights=None, num_classes=len(vocab))
+    return Learner(dls, model, loss_func=CrossEntropyLossFlat())
+
+def _export_standin(vocab, arch: str, size: int, backend: str, path: str):
+    import export_model
+    make_standin_learner(vocab, arch, size).export(path)
+    flags = ["--no-onnx"] if backend.startswith("torchscript") else ["--no-torchscript"]
+    if backend.endswith("int8"): flags.append("--int8")
+    if export_model.main([path, *flags, "--check-n", "2"]) != 0:
+        sys.exit(1)
+
+def load_bench_backend(args):
+    from backends import FastaiBackend, load_backend
+    if args.model_path:
+        return load_backend(args.backend, args.model_path)
+    if args.backend == "fastai":
+        return FastaiBackend(make_standin_learner(args.vocab, args.arch, args.size))
+    # TorchScript/ONNX: stand-in 생성/내보내기는 별도 프로세스에서 (fastai 메모리가 RSS 에 섞이지 않도록)
+    path = os.path.join(tempfile.mkdtemp(prefix="bench-export-"), "model.pkl")
+    proc = multiprocessing.get_context("spawn").Process(
+        target=_export_standin, args=(args.vocab, args.arch, args.size, args.backend, path))
+    proc.start()
+    proc.join()
+    if proc.exitcode != 0:
+        raise RuntimeError(f"stand-in 내보내기 실패 (exit {proc.exitcode})")
+    return load_backend(args.backend, path)
+
+# ======================
+# 측정
+# ======================
+class Recorder:
+    def __init__(self):
+        self.stages: dict[str, list[float]] = {}
+        self.by_input: dict[str, list[float]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, seconds: float):
+        with self._lock:
+            self.stages.setdefault(stage, []).append(seconds)
+
+    def add_input(self, name: str, seconds: float):
+        with self._lock:
+            self.by_input.setdefault(name, []).append(seconds)
+
+def summarize(samples: list[float]) -> dict:
+    a = np.asarray(samples) * 1000.0
+    return {"n": int(a.size), "mean_ms": float(a.mean()), "p50_ms": float(np.percentile(a, 50)),
+            "p95_ms": float(np.percentile(a, 95)), "p99_ms": float(np.percentile(a, 99)),
+            "max_ms": float(a.max())}
+
+def render_all(labels, result) -> str:
+    pred, _, probs = result
+    html = [prediction_box_html(pred)]
+    html += [prob_card_html(lbl, p, lbl == pred) for lbl, p in sorted_probs(labels, probs)]
+    return "".join(html)
+
+def run_one(model, item, decode_side, rec: Recorder):
+    """단일 이미지 한 번: 디코드 → 미리보기 → predict → 렌더 (model 이 InferenceWorker 면 앱과 같은 경로)."""
+    t0 = time.perf_counter()
+    pil = load_pil_from_bytes(item["bytes"], decode_side)
+    t1 = time.perf_counter()
+    make_preview(pil)
+    t2 = time.perf_counter()
+    result = model.predict(pil)
+    t3 = time.perf_counter()
+    render_all(model.vocab, result)
+    t4 = time.perf_counter()
+    for stage, dt in (("decode", t1 - t0), ("preview", t2 - t1), ("predict", t3 - t2),
+                      ("render", t4 - t3), ("end_to_end", t4 - t0)):
+        rec.add(stage, dt)
+    rec.add_input(item["name"], t4 - t0)
+
+def run_batch(model, items, decode_side, bs: int, rec: Recorder):
+    """일괄 모드: bs 장씩 디코드 후 predict_batch 한 번. 시간은 장당으로 환산해 기록."""
+    for i in range(0, len(items), bs):
+        chunk = items[i:i + bs]
+        t0 = time.perf_counter()
+        pils = [load_pil_from_bytes(it["bytes"], decode_side) for it in chunk]
+        t1 = time.perf_counter()
+        probs = model.predict_batch(pils, bs)
+        t2 = time.perf_counter()
+        for p in probs:
+            j = int(np.argmax(p))
+            render_all(model.vocab, (model.vocab[j], j, p))
+        t3 = time.perf_counter()
+        n = len(chunk)
+        for stage, dt in (("decode", t1 - t0), ("predict", t2 - t1), ("render", t3 - t2), ("end_to_end", t3 - t0)):
+            for _ in range(n): rec.add(stage, dt / n)
+        for it in chunk: rec.add_input(it["name"], (t3 - t0) / n)
+
+def run_benchmark(args) -> dict:
+    resolutions = [tuple(int(x) for x in r.split("x")) for r in args.resolutions]
+    items = make_inputs(args.formats, resolutions, args.orientations)
+    model = load_bench_backend(args)
+    # Linux ru_maxrss 는 KB. 로드 직후 값과 측정 후 최고값을 따로 기록
+    rss_after_load = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+    if args.mode == "worker":
+        from infer_worker import InferenceWorker
+        model = InferenceWorker(model, max_batch=args.batch_size, max_wait_ms=args.max_wait_ms,
+                                queue_size=max(256, args.concurrency * 4), torch_threads=args.torch_threads,
+                                submit_timeout=60)
+    elif args.torch_threads:
+        from infer_worker import set_torch_threads
+        set_torch_threads(args.torch_threads)
+    decode_side = None if args.full_decode else max(2 * model.input_size, PREVIEW_MAX_SIDE)
+
+    for item in items[:max(1, args.warmup)]:
+        run_one(model, item, decode_side, Recorder())
+
+    rec = Recorder()
+    work = [it for _ in range(args.repeat) for it in items]
+    t0 = time.perf_counter()
+    if args.mode == "batch":
+        run_batch(model, work, decode_side, args.batch_size, rec)
+    elif args.mode == "worker":
+        chunks = [work[i::args.concurrency] for i in range(args.concurrency)]
+        threads = [threading.Thread(target=lambda c=c: [run_one(model, it, decode_side, rec) for it in c])
+                   for c in chunks]
+        for t in threads: t.start()
+        for t in threads: t.join()
+    else:
+        for it in work: run_one(model, it, decode_side, rec)
+    wall = time.perf_counter() - t0
+    if args.mode == "worker":
+        worker_stats = model.stats()
+        model.close()
+
+    report = {
+        "meta": {"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "python": platform.python_version(),
+                 "platform": platform.platform(), "cpu_count": os.cpu_count(),
+                 "backend": model.name, "arch": None if args.model_path else args.arch,
+                 "model_path": args.model_path, "mode": args.mode, "batch_size": args.batch_size,
+                 "concurrency": args.concurrency, "decode_side": decode_side, "vocab": list(model.vocab)},
+        "images": len(work),
+        "wall_s": wall,
+        "throughput_ips": len(work) / wall if wall else 0.0,
+        "rss_after_load_mb": rss_after_load,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0,
+        "stages": {k: summarize(v) for k, v in rec.stages.items()},
+        "by_input": {k: summarize(v) for k, v in sorted(rec.by_input.items())},
+    }
+    if args.mode == "worker": report["worker"] = worker_stats
+    return report
+
+def compare(report: dict, baseline: dict, threshold: float) -> list[str]:
+    """stage 별 p95 가 baseline 대비 threshold 배 이상 느려졌거나 처리량이 1/threshold 이하로 떨어지면 회귀."""
+    regressions = []
+    for stage, cur in report["stages"].items():
+        old = baseline.get("stages", {}).get(stage)
+        if old and old["p95_ms"] > 0 and cur["p95_ms"] / old["p95_ms"] > threshold:
+            regressions.append(f"{stage}: p95 {old['p95_ms']:.2f}ms → {cur['p95_ms']:.2f}ms")
+    old_tp = baseline.get("throughput_ips")
+    if old_tp and report["throughput_ips"] * threshold < old_tp:
+        regressions.append(f"throughput: {old_tp:.1f} → {report['throughput_ips']:.1f} img/s")
+    return regressions
+
+def print_report(report: dict):
+    m = report["meta"]
+    print(f"backend={m['backend']} mode={m['mode']} images={report['images']} decode_side={m['decode_side']}")
+    print(f"{'stage':12s} {'p50':>9s} {'p95':>9s} {'p99':>9s}  (ms)")
+    for stage, s in report["stages"].items():
+        print(f"{stage:12s} {s['p50_ms']:9.2f} {s['p95_ms']:9.2f} {s['p99_ms']:9.2f}")
+    print(f"throughput {report['throughput_ips']:.1f} img/s · RSS after load {report['rss_after_load_mb']:.0f} MB"
+          f" · peak RSS {report['peak_rss_mb']:.0f} MB")
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="분류 파이프라인 오프라인 벤치마크")
+    ap.add_argument("--backend", default="fastai",
+                    choices=["fastai", "torchscript", "torchscript-int8", "onnx", "onnx-int8"])
+    ap.add_argument("--model-path", default=None, help="없으면 로컬 stand-in learner 사용")
+    ap.add_argument("--arch", default="resnet18", help="stand-in 구조: tiny 또는 torchvision 모델 이름")
+    ap.add_argument("--vocab", nargs="+", default=DEFAULT_VOCAB)
+    ap.add_argument("--size", type=int, default=224, help="stand-in 입력 크기")
+    ap.add_argument("--formats", nargs="+", default=list(FORMATS), choices=list(FORMATS))
+    ap.add_argument("--resolutions", nargs="+", default=["640x480", "1920x1080", "4032x3024"])
+    ap.add_argument("--orientations", nargs="+", type=int, default=[1, 6])
+    ap.add_argument("--mode", default="worker", choices=["worker", "batch", "direct"],
+                    help="worker: 앱과 같은 경로 (InferenceWorker → predict_batch) · "
+                         "batch: 일괄 탭처럼 bs 장씩 predict_batch · direct: backend.predict 직접 (앱은 안 씀)")
+    ap.add_argument("--batch-size", type=int, default=16)
+    ap.add_argument("--concurrency", type=int, default=1, help="worker 모드 동시 요청 스레드 수")
+    ap.add_argument("--max-wait-ms", type=float, default=10.0)
+    ap.add_argument("--torch-threads", type=int, default=None)
+    ap.add_argument("--full-decode", action="store_true", help="축소 디코딩 없이 원본 해상도로 디코드")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--warmup", type=int, default=2)
+    ap.add_argument("--out", default="bench_output.json")
+    ap.add_argument("--compare", default=None, help="비교할 이전 결과 JSON")
+    ap.add_argument("--threshold", type=float, default=1.2)
+    args = ap.parse_args(argv)
+
+    report = run_benchmark(args)
+    print_report(report)
+    with open(args.out, "w", encoding="utf-8") as fh:
+        json.dump(report, fh, ensure_ascii=False, indent=2)
+    print(f"→ {args.out}")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as fh:
+            regressions = compare(report, json.load(fh), args.threshold)
+        for r in regressions: print(f"REGRESSION {r}")
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+# content_store.py
+# 라벨별 콘텐츠 매니페스트 + 로컬 에셋 캐시
+#   매니페스트(JSON, .yaml/.yml 은 PyYAML 필요):
+#     {"labels": {"<vocab 라벨>": {"texts": [...], "images": [...], "videos": [...]}},
+#      "by_index": [{...}, {...}]}   # labels 에 없으면 vocab 순서로 매칭
+#   이미지/유튜브 썸네일은 한 번만 받아 카드 크기로 줄여 WebP 로 저장하고, 이후에는 로컬 파일에서 제공.
+#   mirror_dir 를 주면 원격 URL 대신 <mirror_dir>/<호스트>/<경로> 파일을 읽음 (오프라인 테스트용).
+#   렌더링 경로(data_uri)는 원격 다운로드를 기다리지 않음: 캐시에 없으면 None → 호출부가 원본 URL 사용.
+#   다운로드는 prefetch 가 백그라운드로 하고, 실패한 에셋은 backoff 동안 다시 시도하지 않음.
+import os, re, json, time, base64, hashlib, threading, urllib.request
+from io import BytesIO
+from urllib.parse import urlparse, unquote
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image
+
+IMAGE_CARD_WIDTH = 360
+VIDEO_CARD_WIDTH = 480
+
+def yt_id_from_url(url: str) -> str | None:
+    if not url: return None
+    pats = [r"(?:v=|/)([0-9A-Za-z_-]{11})(?:\?|&|/|$)", r"youtu\.be/([0-9A-Za-z_-]{11})"]
+    for p in pats:
+        m = re.search(p, url)
+        if m: return m.group(1)
+    return None
+
+def yt_thumb(url: str) -> str | None:
+    vid = yt_id_from_url(url)
+    return f"https://img.youtube.com/vi/{vid}/hqdefault.jpg" if vid else None
+
+def pick_top3(lst):
+    return [x for x in lst if isinstance(x, str) and x.strip()][:3]
+
+# ======================
+# 매니페스트
+# ======================
+def load_content_manifest(path: str) -> dict:
+    if not os.path.exists(path):
+        return {"labels": {}, "by_index": [], "base_dir": os.path.dirname(os.path.abspath(path))}
+    with open(path, encoding="utf-8") as fh:
+        if path.endswith((".yaml", ".yml")):
+            import yaml
+            manifest = yaml.safe_load(fh) or {}
+        else:
+            manifest = json.load(fh)
+    manifest.setdefault("labels", {})
+    manifest.setdefault("by_index", [])
+    manifest["base_dir"] = os.path.dirname(os.path.abspath(path))
+    return manifest
+
+def content_for_label(manifest: dict, label: str, vocab: list[str]):
+    """라벨명으로 콘텐츠 반환 (texts, images, videos). 없으면 빈 리스트."""
+    cfg = manifest["labels"].get(label)
+    if cfg is None and label in vocab and vocab.index(label) < len(manifest["by_index"]):
+        cfg = manifest["by_index"][vocab.index(label)]
+    cfg = cfg or {}
+    return (
+        pick_top3(cfg.get("texts", [])),
+        pick_top3(cfg.get("images", [])),
+        pick_top3(cfg.get("videos", [])),
+    )
+
+# ======================
+# 에셋 캐시
+# ======================
+class AssetCache:
+    """원본 → 카드 크기 WebP 로컬 캐시. 총 용량이 max_bytes 를 넘으면 오래 안 쓴 파일부터 삭제."""
+
+    def __init__(self, root: str = ".asset_cache", max_bytes: int = 64 << 20, base_dir: str = ".",
+                 mirror_dir: str | None = None, timeout: float = 5.0, workers: int = 4,
+                 backoff: float = 30.0, max_backoff: float = 1800.0):
+        self.root, self.max_bytes, self.base_dir = root, max_bytes, base_dir
+        self.mirror_dir, self.timeout = mirror_dir, timeout
+        self.backoff, self.max_backoff = backoff, max_backoff
+        os.makedirs(root, exist_ok=True)
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="asset")
+        self._pending: dict = {}
+        self._failures: dict = {}   # (src, width) → (연속 실패 횟수, 재시도 가능 시각)
+        self._lock = threading.Lock()
+        self._uri_cache: dict = {}
+
+    @staticmethod
+    def is_remote(src: str) -> bool:
+        return src.startswith(("http://", "https://"))
+
+    def path_for(self, src: str, width: int) -> str:
+        key = hashlib.sha1(f"{src}|{width}".encode()).hexdigest()
+        return os.path.join(self.root, f"{key}.webp")
+
+    def _read_source(self, src: str) -> bytes:
+        if src.startswith("data:"):
+            return base64.b64decode(src.split(",", 1)[1])
+        if self.is_remote(src):
+            if self.mirror_dir:
+                u = urlparse(src)
+                with open(os.path.join(self.mirror_dir, u.netloc, unquote(u.path).lstrip("/")), "rb") as fh:
+                    return fh.read()
+            req = urllib.request.Request(src, headers={"User-Agent": "Mozilla/5.0"})
+            with urllib.request.urlopen(req, timeout=self.timeout) as r:
+                return r.read()
+        with open(os.path.join(self.base_dir, src), "rb") as fh:
+            return fh.read()
+
+    @staticmethod
+    def _touch(path: str) -> bool:
+        """LRU 용 최근 사용 시각 갱신 (1분에 한 번만). 파일이 없으면 False."""
+        try:
+            if time.time() - os.path.getmtime(path) > 60: os.utime(path)
+            return True
+        except OSError:
+            return False
+
+    def _build(self, src: str, width: int) -> str:
+        path = self.path_for(src, width)
+        if self._touch(path):
+            return path
+        img = Image.open(BytesIO(self._read_source(src)))
+        img.draft("RGB", (width, width))
+        img = img.convert("RGB")
+        if img.width > width:
+            img = img.resize((width, round(img.height * width / img.width)), Image.LANCZOS)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        img.save(tmp, format="WEBP", quality=80, method=4)
+        os.replace(tmp, path)
+        self._evict()
+        return path
+
+    def _evict(self):
+        stats = []
+        for name in os.listdir(self.root):
+            if not name.endswith(".webp"): continue
+            f = os.path.join(self.root, name)
+            try:
+                st = os.stat(f)
+            except OSError:   # 다른 스레드가 방금 지움
+                continue
+            stats.append((st.st_mtime, st.st_size, f))
+        stats.sort()
+        total = sum(s for _, s, _ in stats)
+        for _, size, f in stats:
+            if total <= self.max_bytes: break
+            try:
+                os.remove(f)
+                total -= size
+            except OSError:
+                pass
+
+    def _record(self, key, fut):
+        with self._lock:
+            if fut.exception() is None:
+                self._failures.pop(key, None)
+                return
+            n = self._failures.get(key, (0, 0.0))[0] + 1
+            self._failures[key] = (n, time.monotonic() + min(self.backoff * 2 ** (n - 1), self.max_backoff))
+
+    def fetch_async(self, src: str, width: int):
+        """백그라운드로 받아두기. 같은 에셋의 중복 요청은 하나의 Future 를 공유.
+        실패한 에셋은 backoff(실패할 때마다 2배, 최대 max_backoff) 가 지나기 전에는 실패한 Future 를 그대로 반환."""
+        key = (src, width)
+        with self._lock:
+            fut = self._pending.get(key)
+            if fut is not None and fut.done() and fut.exception() is not None \
+                    and time.monotonic() >= self._failures.get(key, (0, float("inf")))[1]:
+                fut = None
+            if fut is not None:
+                return fut
+            fut = self._pending[key] = self._pool.submit(self._build, src, width)
+        # 락 밖에서 등록: 이미 끝난 Future 면 콜백이 이 스레드에서 바로 실행되고 _record 가 락을 잡음
+        fut.add_done_callback(lambda f, key=key: self._record(key, f))
+        return fut
+
+    def cached(self, src: str, width: int) -> str | None:
+        """이미 로컬에 있을 때만 경로 (기다리지 않음). 로컬 파일/data URI 원본은 바로 만들어 둠."""
+        path = self.path_for(src, width)
+        if self._touch(path):
+            return path
+        if self.is_remote(src):
+            return None
+        try:
+            return self._build(src, width)
+        except Exception:
+            return None
+
+    def data_uri(self, src: str, width: int) -> str | None:
+        """HTML 카드에 넣을 data URI (로컬 파일에서 읽고 메모리에 재사용). 원격 에셋이 아직 캐시에
+        없으면 None → 호출부는 원본 URL 로 대체 (렌더링이 다운로드를 기다리지 않음)."""
+        path = self.cached(src, width)
+        if path is None: return None
+        uri = self._uri_cache.get(path)
+        if uri is None:
+            try:
+                with open(path, "rb") as fh:
+                    uri = "data:image/webp;base64," + base64.b64encode(fh.read()).decode()
+            except OSError:
+                return None
+            if len(self._uri_cache) > 256: self._uri_cache.clear()
+            self._uri_cache[path] = uri
+        return uri
+
+    def prefetch(self, manifest: dict, labels, vocab: list[str]):
+        """라벨들의 이미지/유튜브 썸네일을 백그라운드로 받아둠."""
+        for label in labels:
+            _, images, videos = content_for_label(manifest, label, vocab)
+            for src in images:
+                self.fetch_async(src, IMAGE_CARD_WIDTH)
+            for v in videos:
+                thumb = yt_thumb(v)
+                if thumb: self.fetch_async(thumb, VIDEO_CARD_WIDTH)
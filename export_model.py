@@ -0,0 +1,109 @@
+# export_model.py
+# model.pkl(fastai Learner) → TorchScript / ONNX (+ int8 동적 양자화) 내보내기 + parity 검사
+#   python export_model.py model.pkl                 # TorchScript + ONNX
+#   python export_model.py model.pkl --int8          # int8 변형도 함께
+#   python export_model.py model.pkl --check-images samples/
+import os, sys, json, argparse
+import numpy as np
+import torch
+from torch import nn
+from PIL import Image
+from backends import FastaiBackend, artifact_path, meta_path, load_backend, parity_check
+from imaging import model_resize
+
+class ExportedModel(nn.Module):
+    """(N, H, W, 3) uint8 입력 → 확률. /255, Normalize, softmax 를 모델 안에 포함."""
+
+    def __init__(self, model: nn.Module, mean, std):
+        super().__init__()
+        self.model = model
+        self.register_buffer("mean", torch.as_tensor(mean, dtype=torch.float32).view(1, 3, 1, 1))
+        self.register_buffer("std", torch.as_tensor(std, dtype=torch.float32).view(1, 3, 1, 1))
+
+    def forward(self, x):
+        x = x.permute(0, 3, 1, 2).float().div(255.0)
+        return torch.softmax(self.model((x - self.mean) / self.std), dim=1)
+
+def learner_meta(learner) -> dict:
+    """vocab, 입력 크기 [높이, 너비], 리사이즈 방식, 정규화 값 추출."""
+    size, method = model_resize(learner)
+    if method not in ("crop", "squish"):
+        raise ValueError(f"리사이즈 방식 `{method}` 는 내보내기를 지원하지 않습니다 (crop / squish 만 가능)")
+    mean, std = [0.0, 0.0, 0.0], [1.0, 1.0, 1.0]
+    for t in learner.dls.after_batch.fs:
+        if type(t).__name__ == "Normalize":
+            mean, std = t.mean.flatten().tolist(), t.std.flatten().tolist()
+    return {"vocab": [str(x) for x in learner.dls.vocab], "size": list(size or (224, 224)),
+            "resize_method": method, "mean": mean, "std": std}
+
+def export_torchscript(wrapped: nn.Module, example, path: str):
+    with torch.inference_mode():
+        traced = torch.jit.trace(wrapped, example)
+    torch.jit.save(torch.jit.freeze(traced), path)
+
+def export_onnx(wrapped: nn.Module, example, path: str):
+    torch.onnx.export(wrapped, example, path, input_names=["input"], output_names=["probs"],
+                      dynamic_axes={"input": {0: "batch"}, "probs": {0: "batch"}}, opset_version=17)
+
+def sample_images(folder: str | None, n: int, size) -> list:
+    if folder:
+        names = sorted(x for x in os.listdir(folder) if not x.startswith("."))[:n]
+        return [Image.open(os.path.join(folder, x)).convert("RGB") for x in names]
+    rng = np.random.default_rng(0)
+    h, w = size
+    return [Image.fromarray(rng.integers(0, 256, (h * 2, w * 2, 3), dtype=np.uint8)) for _ in range(n)]
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="model.pkl 을 TorchScript/ONNX 로 내보내고 parity 검사")
+    ap.add_argument("model_path", nargs="?", default="model.pkl")
+    ap.add_argument("--no-torchscript", action="store_true")
+    ap.add_argument("--no-onnx", action="store_true")
+    ap.add_argument("--int8", action="store_true", help="int8 동적 양자화 변형도 생성")
+    ap.add_argument("--check-images", default=None, help="parity 검사용 이미지 폴더 (없으면 랜덤 이미지)")
+    ap.add_argument("--check-n", type=int, default=16)
+    ap.add_argument("--atol", type=float, default=1e-3)
+    ap.add_argument("--int8-atol", type=float, default=5e-2)
+    args = ap.parse_args(argv)
+
+    from fastai.vision.all import load_learner
+    learner = load_learner(args.model_path, cpu=True)
+    meta = learner_meta(learner)
+    with open(meta_path(args.model_path), "w", encoding="utf-8") as fh:
+        json.dump(meta, fh, ensure_ascii=False, indent=2)
+
+    model = learner.model.eval().cpu()
+    wrapped = ExportedModel(model, meta["mean"], meta["std"]).eval()
+    example = torch.zeros((1, meta["size"][0], meta["size"][1], 3), dtype=torch.uint8)
+    kinds = []
+    if not args.no_torchscript:
+        export_torchscript(wrapped, example, artifact_path(args.model_path, "torchscript"))
+        kinds.append("torchscript")
+        if args.int8:
+            # 동적 양자화는 Linear(헤드)에만 적용됨; conv 바디는 fp32 유지
+            q = torch.ao.quantization.quantize_dynamic(model, {nn.Linear}, dtype=torch.qint8)
+            qwrapped = ExportedModel(q, meta["mean"], meta["std"]).eval()
+            export_torchscript(qwrapped, example, artifact_path(args.model_path, "torchscript-int8"))
+            kinds.append("torchscript-int8")
+    if not args.no_onnx:
+        onnx_path = artifact_path(args.model_path, "onnx")
+        export_onnx(wrapped, example, onnx_path)
+        kinds.append("onnx")
+        if args.int8:
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+            quantize_dynamic(onnx_path, artifact_path(args.model_path, "onnx-int8"), weight_type=QuantType.QInt8)
+            kinds.append("onnx-int8")
+
+    reference = FastaiBackend(learner)
+    pils = sample_images(args.check_images, args.check_n, meta["size"])
+    ok = True
+    for kind in kinds:
+        atol = args.int8_atol if kind.endswith("int8") else args.atol
+        res = parity_check(reference, load_backend(kind, args.model_path), pils, atol=atol)
+        size_mb = os.path.getsize(artifact_path(args.model_path, kind)) / 1e6
+        print(f"{kind:18s} {size_mb:7.1f}MB  label_match={res['label_match']:.3f}  "
+              f"max_abs_diff={res['max_abs_diff']:.2e}  {'OK' if res['ok'] else 'FAIL'}")
+        ok &= res["ok"]
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
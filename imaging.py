@@ -0,0 +1,60 @@
+# imaging.py
+# 이미지 디코딩/미리보기 유틸
+from io import BytesIO
+from PIL import Image
+
+PREVIEW_MAX_SIDE = 512
+
+# EXIF Orientation → transpose (ImageOps.exif_transpose 와 같은 매핑)
+_EXIF_TRANSPOSE = {
+    2: Image.Transpose.FLIP_LEFT_RIGHT,
+    3: Image.Transpose.ROTATE_180,
+    4: Image.Transpose.FLIP_TOP_BOTTOM,
+    5: Image.Transpose.TRANSPOSE,
+    6: Image.Transpose.ROTATE_270,
+    7: Image.Transpose.TRANSVERSE,
+    8: Image.Transpose.ROTATE_90,
+}
+
+def model_resize(learner) -> tuple[tuple[int, int] | None, str]:
+    """learner 의 Resize 계열 변환(after_item, 없으면 after_batch 의 aug_transforms)에서
+    ((높이, 너비), 리사이즈 방식). fastai 는 size 를 (너비, 높이) 로 저장하므로 뒤집음. 없으면 (None, "crop")."""
+    for pipe in (getattr(learner.dls, "after_item", None), getattr(learner.dls, "after_batch", None)):
+        for t in getattr(pipe, "fs", []):
+            size = getattr(t, "size", None)
+            if not size: continue
+            method = str(getattr(t, "method", "crop"))
+            if isinstance(size, int): return (size, size), method
+            return (int(size[1]), int(size[0])), method
+    return None, "crop"
+
+def model_input_size(learner, default: int = 224) -> int:
+    """모델 입력의 긴 변 길이. 없으면 default."""
+    size, _ = model_resize(learner)
+    return max(size) if size else default
+
+def load_pil_from_bytes(b: bytes, min_side: int | None = None) -> Image.Image:
+    """바이트 → RGB PIL. min_side 가 주어지면 짧은 변이 min_side 이상인 선에서 축소 디코딩
+    (JPEG 는 draft 로 DCT 단계에서 1/2~1/8 디코드, 그 외는 reduce)."""
+    pil = Image.open(BytesIO(b))
+    if min_side and pil.format == "JPEG":
+        pil.draft("RGB", (min_side, min_side))
+    # 방향 태그는 load 이후에 읽음 (TIFF 는 load 시 스스로 회전하고 태그를 지움)
+    pil.load()
+    orientation = pil.getexif().get(0x0112, 1)
+    if pil.mode != "RGB": pil = pil.convert("RGB")
+    if min_side:
+        f = min(pil.size) // min_side
+        if f >= 2: pil = pil.reduce(f)
+    # 회전은 축소된 이미지에만 적용 (EXIF 블록 복사 없음)
+    op = _EXIF_TRANSPOSE.get(orientation)
+    if op is not None: pil = pil.transpose(op)
+    return pil
+
+def make_preview(pil: Image.Image, max_side: int = PREVIEW_MAX_SIDE, quality: int = 85) -> bytes:
+    """세션에 보관할 축소 미리보기(JPEG 바이트). 원본 바이트 대신 저장."""
+    thumb = pil.copy()
+    thumb.thumbnail((max_side, max_side))
+    buf = BytesIO()
+    thumb.save(buf, format="JPEG", quality=quality)
+    return buf.getvalue()
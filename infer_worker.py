@@ -0,0 +1,211 @@
+# infer_worker.py
+# 세션 공유 마이크로배칭 추론 워커
+#   세션 스레드는 submit() 으로 큐에 넣고 Future 를 받음.
+#   워커 스레드는 max_wait_ms 안에 들어온 요청을 최대 max_batch 개까지 묶어 한 번의 forward pass 로 처리.
+#   일괄 작업(predict_batch)은 별도 큐로 bs 장씩 한 번의 forward pass. 단건 요청이 있으면 항상 먼저 처리
+#   (일괄 작업은 호출마다 한 묶음씩만 넣으므로 단건 요청은 최대 한 묶음만 기다림).
+#   큐가 가득 차면 QueueFullError (backpressure). processes > 0 이면 배치를 프로세스 풀에 분산.
+#   풀이 깨지면(자식 OOM/크래시, initializer 실패) 해당 배치는 오류로 끝내고 풀을 다시 만듦.
+#   max_pool_restarts 회를 넘기면 메인 프로세스의 backend 로 추론.
+import time, threading, multiprocessing
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+import numpy as np
+
+class QueueFullError(RuntimeError):
+    pass
+
+class InferenceTimeoutError(RuntimeError):
+    pass
+
+def set_torch_threads(n: int | None):
+    if not n: return
+    try:
+        import torch
+        torch.set_num_threads(int(n))
+    except ImportError:
+        pass
+
+# ---- 프로세스 풀 모드: 자식 프로세스마다 백엔드를 한 번 로드 ----
+_proc_backend = None
+
+def _proc_init(kind: str, model_path: str, torch_threads: int | None):
+    global _proc_backend
+    set_torch_threads(torch_threads)
+    from backends import load_backend
+    _proc_backend = load_backend(kind, model_path)
+    _proc_backend.warmup()
+
+def _proc_predict(pils) -> np.ndarray:
+    return np.asarray(_proc_backend.predict_batch(pils, bs=len(pils)))
+
+class InferenceWorker:
+    """backend 와 같은 인터페이스(vocab, input_size, predict, predict_batch)를 제공하므로 그대로 대체 가능."""
+
+    def __init__(self, backend, max_batch: int = 16, max_wait_ms: float = 10.0, queue_size: int = 256,
+                 torch_threads: int | None = None, processes: int = 0, model_path: str | None = None,
+                 submit_timeout: float = 1.0, result_timeout: float = 30.0, batch_timeout: float = 300.0,
+                 max_pool_restarts: int = 2):
+        self.backend = backend
+        self.name, self.vocab, self.input_size = backend.name, backend.vocab, backend.input_size
+        self.max_batch, self.max_wait = max_batch, max_wait_ms / 1000.0
+        self.submit_timeout, self.result_timeout, self.batch_timeout = submit_timeout, result_timeout, batch_timeout
+        self.queue_size = queue_size
+        # 항목: (이미지 리스트, Future, 단건 여부)
+        self._fast: deque = deque()
+        self._bulk: deque = deque()
+        self._cv = threading.Condition()
+        self._closed = False
+        self.batches = self.items = self.rejected = self.pool_restarts = 0
+        self.processes, self.model_path, self.torch_threads = processes, model_path, torch_threads
+        self.max_pool_restarts = max_pool_restarts
+        self._pool, self._pool_broken = None, False
+        if processes > 0:
+            if model_path is None:
+                raise ValueError("프로세스 풀 모드에는 model_path 가 필요합니다")
+            self._pool = self._make_pool()
+            # 풀이 바쁜 동안에는 큐에서 요청을 더 모아 다음 배치를 키움
+            self._inflight = threading.Semaphore(processes)
+        else:
+            set_torch_threads(torch_threads)
+        self._thread = threading.Thread(target=self._loop, name="infer-worker", daemon=True)
+        self._thread.start()
+
+    def _make_pool(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(self.processes, mp_context=multiprocessing.get_context("spawn"),
+                                   initializer=_proc_init,
+                                   initargs=(self.backend.name, self.model_path, self.torch_threads))
+
+    def _restart_pool(self):
+        """깨진 풀을 버리고 새로 만듦. 재시작 한도를 넘기면 프로세스 내 추론으로 전환."""
+        old, self._pool, self._pool_broken = self._pool, None, False
+        old.shutdown(wait=False, cancel_futures=True)
+        self.pool_restarts += 1
+        if self.pool_restarts <= self.max_pool_restarts:
+            self._pool = self._make_pool()
+        else:
+            set_torch_threads(self.torch_threads)
+
+    # ---- 제출 ----
+    def _put(self, dq: deque, entry, timeout: float | None):
+        with self._cv:
+            ok = self._cv.wait_for(lambda: self._closed or len(dq) < self.queue_size, timeout)
+            if self._closed:
+                raise RuntimeError("워커가 종료되었습니다")
+            if not ok:
+                self.rejected += 1
+                raise QueueFullError(f"추론 대기열이 가득 찼습니다 ({self.queue_size})")
+            dq.append(entry)
+            self._cv.notify_all()
+        return entry[1]
+
+    def submit(self, pil, timeout: float | None = 0) -> Future:
+        """요청을 큐에 넣고 Future(확률 1차원 배열)를 반환. timeout 안에 자리가 없으면 QueueFullError."""
+        return self._put(self._fast, ([pil], Future(), True), timeout)
+
+    @staticmethod
+    def _wait(futs, timeout: float):
+        try:
+            return [f.result(timeout) for f in futs]
+        except FutureTimeoutError:
+            for f in futs: f.cancel()
+            raise InferenceTimeoutError(f"추론 결과를 {timeout:g}초 안에 받지 못했습니다") from None
+
+    def predict(self, pil, timeout: float | None = None):
+        """backend.predict 와 같은 (pred, pred_idx, probs). 큐 자리는 submit_timeout, 결과는
+        timeout(기본 result_timeout) 까지만 기다림 → QueueFullError / InferenceTimeoutError."""
+        fut = self.submit(pil, self.submit_timeout)
+        probs = tuple(float(p) for p in self._wait([fut], timeout or self.result_timeout)[0])
+        i = int(np.argmax(probs))
+        return self.vocab[i], i, probs
+
+    def predict_batch(self, pils, bs: int | None = None) -> np.ndarray:
+        """일괄 모드: bs(기본 max_batch) 장씩 한 묶음을 넣고 결과를 받은 뒤 다음 묶음을 넣음.
+        묶음은 다른 요청과 합치지 않고 그대로 한 번의 forward pass. 묶음마다 batch_timeout 까지 기다림."""
+        pils = list(pils)
+        if not pils: return np.empty((0, len(self.vocab)), dtype=np.float32)
+        bs = bs or self.max_batch
+        out = []
+        for i in range(0, len(pils), bs):
+            fut = self._put(self._bulk, (pils[i:i + bs], Future(), False), None)
+            out.append(self._wait([fut], self.batch_timeout)[0])
+        return np.concatenate(out)
+
+    # ---- 워커 루프 ----
+    def _collect(self):
+        with self._cv:
+            self._cv.wait_for(lambda: self._fast or self._bulk or self._closed)
+            if self._fast:
+                batch = [self._fast.popleft()]
+                deadline = time.monotonic() + self.max_wait
+                while len(batch) < self.max_batch:
+                    if self._fast:
+                        batch.append(self._fast.popleft())
+                        continue
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 or self._closed: break
+                    self._cv.wait(remaining)
+            elif self._bulk:
+                batch = [self._bulk.popleft()]
+            else:
+                return None
+            # 자리를 기다리는 submit 깨움
+            self._cv.notify_all()
+        # 취소된 요청은 버림
+        return [e for e in batch if e[1].set_running_or_notify_cancel()]
+
+    @staticmethod
+    def _resolve(batch, probs=None, exc=None):
+        off = 0
+        for pils, fut, single in batch:
+            if exc is not None: fut.set_exception(exc)
+            else: fut.set_result(probs[off] if single else probs[off:off + len(pils)])
+            off += len(pils)
+
+    def _loop(self):
+        while True:
+            batch = self._collect()
+            if batch is None: break
+            if not batch: continue
+            pils = [p for e in batch for p in e[0]]
+            self.batches += 1
+            self.items += len(pils)
+            if self._pool is not None and self._pool_broken:
+                self._restart_pool()
+            if self._pool is None:
+                try:
+                    self._resolve(batch, probs=np.asarray(self.backend.predict_batch(pils, bs=len(pils))))
+                except Exception as e:
+                    self._resolve(batch, exc=e)
+                continue
+            self._inflight.acquire()
+            try:
+                job = self._pool.submit(_proc_predict, pils)
+            except Exception as e:
+                # BrokenProcessPool 등: 이 배치는 오류로 끝내고 풀 재생성 (스레드는 계속 돎)
+                self._inflight.release()
+                self._resolve(batch, exc=e)
+                self._restart_pool()
+                continue
+
+            def _done(job, batch=batch, pool=self._pool):
+                self._inflight.release()
+                exc = job.exception() if not job.cancelled() else RuntimeError("추론 작업이 취소되었습니다")
+                if isinstance(exc, BrokenProcessPool) and pool is self._pool: self._pool_broken = True
+                self._resolve(batch, probs=None if exc else job.result(), exc=exc)
+            job.add_done_callback(_done)
+
+    def stats(self) -> dict:
+        return {"queue": len(self._fast), "queue_max": self.queue_size, "bulk": len(self._bulk),
+                "batches": self.batches,
+                "items": self.items, "rejected": self.rejected, "pool_restarts": self.pool_restarts,
+                "avg_batch": (self.items / self.batches) if self.batches else 0.0}
+
+    def close(self):
+        with self._cv:
+            self._closed = True
+            self._cv.notify_all()
+        self._thread.join(timeout=5)
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
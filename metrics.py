@@ -0,0 +1,120 @@
+# metrics.py
+# 프로세스 내 메트릭 레지스트리: 단계별 타이밍/카운터/게이지 + 최근 N개 롤링 히스토그램
+#   with metrics.timer("decode"): ...
+#   metrics.observe("input_bytes", len(b)); metrics.inc("predictions_total")
+# Prometheus 텍스트 포맷 / JSON 으로 내보내기. enabled=False 면 모든 호출이 no-op.
+import os, json, time, threading
+from collections import deque
+from contextlib import contextmanager, nullcontext
+
+_NULL = nullcontext()
+QUANTILES = (0.5, 0.95, 0.99)
+
+def _exact(v: float) -> str:
+    """누적값(카운터, 합계)은 반올림 없이: 정수면 정수로, 아니면 repr."""
+    v = float(v)
+    return str(int(v)) if v.is_integer() else repr(v)
+
+class RollingHistogram:
+    """누적 count/sum + 최근 window 개 샘플로 분위수 계산."""
+
+    def __init__(self, window: int = 1024):
+        self.samples: deque = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, v: float):
+        self.samples.append(v)
+        self.count += 1
+        self.total += v
+
+    def quantiles(self, qs=QUANTILES) -> dict:
+        if not self.samples: return {q: 0.0 for q in qs}
+        s = sorted(self.samples)
+        return {q: s[min(len(s) - 1, int(q * len(s)))] for q in qs}
+
+    def summary(self) -> dict:
+        qs = self.quantiles()
+        return {"count": self.count, "sum": self.total, "window": len(self.samples),
+                **{f"p{int(q * 100)}": v for q, v in qs.items()}}
+
+class MetricsRegistry:
+    def __init__(self, enabled: bool = True, window: int = 1024, prefix: str = "classifier"):
+        self.enabled, self.window, self.prefix = enabled, window, prefix
+        self._hist: dict[str, RollingHistogram] = {}
+        self._counters: dict[str, float] = {}
+        self._gauges: dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._last_dump = 0.0
+        self.started = time.time()
+
+    # ---- 기록 ----
+    def observe(self, name: str, value: float):
+        if not self.enabled: return
+        with self._lock:
+            h = self._hist.get(name)
+            if h is None: h = self._hist[name] = RollingHistogram(self.window)
+            h.add(float(value))
+
+    def inc(self, name: str, n: float = 1):
+        if not self.enabled: return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+
+    def gauge(self, name: str, value: float):
+        if not self.enabled: return
+        with self._lock:
+            self._gauges[name] = float(value)
+
+    def record_stage(self, stage: str, seconds: float):
+        self.observe(f"stage_{stage}_seconds", seconds)
+
+    @contextmanager
+    def _timer(self, stage: str):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_stage(stage, time.perf_counter() - t0)
+
+    def timer(self, stage: str):
+        """단계 소요 시간을 stage_<stage>_seconds 히스토그램에 기록."""
+        return self._timer(stage) if self.enabled else _NULL
+
+    # ---- 내보내기 ----
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {"uptime_s": time.time() - self.started,
+                    "histograms": {k: h.summary() for k, h in self._hist.items()},
+                    "counters": dict(self._counters), "gauges": dict(self._gauges)}
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), ensure_ascii=False, indent=2)
+
+    def to_prometheus(self) -> str:
+        snap, p, lines = self.snapshot(), self.prefix, []
+        for name, s in sorted(snap["histograms"].items()):
+            lines.append(f"# TYPE {p}_{name} summary")
+            for q in QUANTILES:
+                lines.append(f'{p}_{name}{{quantile="{q}"}} {s[f"p{int(q * 100)}"]:.6g}')
+            lines.append(f"{p}_{name}_sum {_exact(s['sum'])}")
+            lines.append(f"{p}_{name}_count {s['count']}")
+        for name, v in sorted(snap["counters"].items()):
+            lines += [f"# TYPE {p}_{name} counter", f"{p}_{name} {_exact(v)}"]
+        for name, v in sorted(snap["gauges"].items()):
+            lines += [f"# TYPE {p}_{name} gauge", f"{p}_{name} {v:.6g}"]
+        return "\n".join(lines) + "\n"
+
+    def maybe_dump(self, json_path: str | None = None, prom_path: str | None = None, interval: float = 30.0):
+        """interval 초에 한 번만 파일로 기록 (prom_path 는 node_exporter textfile collector 용)."""
+        if not self.enabled or not (json_path or prom_path): return
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_dump < interval: return
+            self._last_dump = now
+        for path, text in ((json_path, self.to_json), (prom_path, self.to_prometheus)):
+            if not path: continue
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as fh:
+                fh.write(text())
+            os.replace(tmp, path)
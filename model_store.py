@@ -0,0 +1,152 @@
+# model_store.py
+# 모델 아티팩트 저장소: 원자적 다운로드 + 체크섬 검증 + 버전별 보관
+#   models/<version>/<filename>        모델 파일
+#   models/<version>/<filename>.ok     검증 완료 표식 {"sha256", "size"}
+# 매니페스트(JSON) 예:
+#   {"latest": "v2",
+#    "models": {"v1": {"url": "gdrive:1l14YM0V...", "sha256": "...", "filename": "model.pkl"},
+#               "v2": {"url": "https://.../model.pkl", "sha256": "...",
+#                      "artifacts": {"onnx": {"url": "https://.../model.onnx", "sha256": "..."},
+#                                    "meta": {"url": "https://.../model.meta.json", "sha256": "..."}}}}}
+# url 은 gdrive:<파일ID> / http(s) URL / 로컬 경로(file:// 포함) — 로컬 경로로 오프라인 테스트 가능.
+# fastai 외 백엔드는 artifacts 에 적힌 해당 아티팩트 + meta 만 받음 (model.pkl 은 받지 않음).
+# sha256 이 없는 파일은 백엔드 로드가 실패하면 표식을 지워 다음 시도에 다시 받음.
+import os, json, shutil, hashlib, tempfile
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from concurrent.futures import Future, ThreadPoolExecutor
+from backends import artifact_path, meta_path
+
+@dataclass
+class ModelEntry:
+    version: str
+    url: str
+    sha256: str | None = None
+    filename: str = "model.pkl"
+    # 백엔드 종류(onnx, torchscript-int8 …) 또는 "meta" → {"url", "sha256"}
+    artifacts: dict = field(default_factory=dict)
+
+class ChecksumError(RuntimeError):
+    pass
+
+def file_sha256(path: str, chunk: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(chunk), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def load_manifest(path: str, version: str | None = None) -> ModelEntry:
+    """매니페스트에서 version(없으면 latest) 항목을 읽음."""
+    with open(path, encoding="utf-8") as fh:
+        manifest = json.load(fh)
+    version = version or manifest.get("latest")
+    models = manifest.get("models", {})
+    if version not in models:
+        raise KeyError(f"매니페스트에 모델 버전 `{version}` 이 없습니다 (있는 버전: {', '.join(models)})")
+    cfg = models[version]
+    return ModelEntry(version=version, url=cfg["url"], sha256=cfg.get("sha256"),
+                      filename=cfg.get("filename", "model.pkl"), artifacts=cfg.get("artifacts", {}))
+
+def _download(url: str, dest: str):
+    if url.startswith("gdrive:"):
+        url = f"https://drive.google.com/uc?id={url[len('gdrive:'):]}"
+    if url.startswith(("http://", "https://")):
+        import gdown
+        if gdown.download(url, dest, quiet=False) is None:
+            raise RuntimeError(f"다운로드 실패: {url}")
+    else:
+        shutil.copyfile(url[len("file://"):] if url.startswith("file://") else url, dest)
+
+class ModelStore:
+    def __init__(self, root: str = "models"):
+        self.root = root
+
+    def path_for(self, entry: ModelEntry) -> str:
+        return os.path.join(self.root, entry.version, entry.filename)
+
+    def files_for(self, entry: ModelEntry, backend: str = "fastai") -> list[tuple[str, str, str | None]]:
+        """backend 에 필요한 (로컬 경로, url, sha256) 목록."""
+        path = self.path_for(entry)
+        if backend == "fastai":
+            return [(path, entry.url, entry.sha256)]
+        art, meta = entry.artifacts.get(backend), entry.artifacts.get("meta")
+        if art and meta:
+            return [(artifact_path(path, backend), art["url"], art.get("sha256")),
+                    (meta_path(path), meta["url"], meta.get("sha256"))]
+        if os.path.exists(artifact_path(path, backend)) and os.path.exists(meta_path(path)):
+            return []   # export_model.py 로 직접 만든 아티팩트
+        raise FileNotFoundError(
+            f"{entry.version}: 매니페스트 artifacts 에 `{backend}`/`meta` 가 없고 로컬에도 없습니다. "
+            f"매니페스트에 추가하거나 `python export_model.py {path}` 로 내보내세요.")
+
+    @staticmethod
+    def _is_valid(path: str, sha256: str | None) -> bool:
+        try:
+            with open(path + ".ok", encoding="utf-8") as fh:
+                ok = json.load(fh)
+            size = os.path.getsize(path)
+        except (OSError, ValueError):
+            return False
+        return ok.get("size") == size and (sha256 is None or ok.get("sha256") == sha256)
+
+    def is_valid(self, entry: ModelEntry, backend: str = "fastai") -> bool:
+        return all(self._is_valid(p, sha) for p, _, sha in self.files_for(entry, backend))
+
+    @staticmethod
+    def _fetch_file(path: str, url: str, sha256: str | None, label: str):
+        """없거나 깨졌으면 임시 파일로 받아 검증 후 rename, 표식 기록."""
+        if ModelStore._is_valid(path, sha256):
+            return
+        d = os.path.dirname(path)
+        os.makedirs(d, exist_ok=True)
+        if os.path.exists(path + ".ok"): os.remove(path + ".ok")
+        fd, tmp = tempfile.mkstemp(dir=d, prefix=".download-", suffix=".part")
+        os.close(fd)
+        try:
+            _download(url, tmp)
+            digest = file_sha256(tmp)
+            if sha256 and digest != sha256:
+                raise ChecksumError(f"{label}: sha256 불일치 (기대 {sha256[:12]}…, 실제 {digest[:12]}…)")
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp): os.remove(tmp)
+        with open(path + ".ok", "w", encoding="utf-8") as fh:
+            json.dump({"sha256": digest, "size": os.path.getsize(path)}, fh)
+
+    def fetch(self, entry: ModelEntry, backend: str = "fastai") -> str:
+        """backend 에 필요한 파일만 받아 검증. 백엔드 로드에 넘길 모델 경로(models/<version>/<filename>) 반환."""
+        for path, url, sha256 in self.files_for(entry, backend):
+            self._fetch_file(path, url, sha256, f"{entry.version}/{os.path.basename(path)}")
+        return self.path_for(entry)
+
+    def invalidate(self, entry: ModelEntry, backend: str = "fastai", unverified_only: bool = True):
+        """검증 표식 삭제 → 다음 fetch 에서 다시 받음. 기본은 sha256 이 없는 파일만."""
+        for path, _, sha256 in self.files_for(entry, backend):
+            if sha256 and unverified_only: continue
+            if os.path.exists(path + ".ok"): os.remove(path + ".ok")
+
+def load_in_background(store: ModelStore, entry: ModelEntry, backend: str = "fastai", warmup: bool = True,
+                       metrics=None) -> Future:
+    """다운로드/검증 → 백엔드 로드(무거운 import 포함) → warm-up 을 백그라운드 스레드에서 실행.
+    결과 Future 의 값은 (backend 객체, 로컬 모델 경로). metrics 가 있으면 단계별 시간 기록."""
+    timer = metrics.timer if metrics is not None else (lambda stage: nullcontext())
+    def _load():
+        from backends import load_backend
+        with timer("model_fetch"):
+            path = store.fetch(entry, backend)
+        try:
+            with timer("model_load"):
+                model = load_backend(backend, path)
+            if warmup:
+                with timer("model_warmup"):
+                    model.warmup()
+        except Exception:
+            # 체크섬 없이 받은 파일이 깨졌을 수 있음 (예: Drive 할당량 초과 HTML 이 그대로 저장됨)
+            store.invalidate(entry, backend)
+            raise
+        return model, path
+    ex = ThreadPoolExecutor(max_workers=1, thread_name_prefix="model-load")
+    fut = ex.submit(_load)
+    ex.shutdown(wait=False)
+    return fut
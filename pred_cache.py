@@ -0,0 +1,62 @@
+# pred_cache.py
+# 세션 간 공유되는 예측 결과 캐시 (이미지 해시 + 모델 식별자 → (pred, pred_idx, probs))
+import os, time, hashlib, threading
+from collections import OrderedDict
+
+def image_hash(b: bytes) -> str:
+    return hashlib.sha256(b).hexdigest()
+
+def model_identity(path: str) -> str:
+    """모델 파일 경로 + 크기 + 수정시각. 파일이 바뀌면 캐시 키도 바뀜."""
+    try:
+        s = os.stat(path)
+        return f"{os.path.abspath(path)}:{s.st_size}:{int(s.st_mtime)}"
+    except OSError:
+        return os.path.abspath(path)
+
+class PredictionCache:
+    """LRU + TTL 예측 캐시. 여러 세션 스레드에서 동시에 쓰므로 lock 사용."""
+
+    def __init__(self, maxsize: int = 256, ttl: float = 3600.0):
+        self.maxsize, self.ttl = maxsize, ttl
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None and self.ttl and now - item[0] > self.ttl:
+                del self._data[key]
+                self.evictions += 1
+                item = None
+            if item is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[1]
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                    "size": len(self._data), "maxsize": self.maxsize,
+                    "hit_rate": (self.hits / total) if total else 0.0}
+
+def pack_prediction(pred, pred_idx, probs) -> tuple:
+    """learner.predict 결과를 텐서 없이 보관 가능한 형태로 변환."""
+    return (str(pred), int(pred_idx), tuple(float(p) for p in probs))
@@ -0,0 +1,56 @@
+# render.py
+# 예측 결과 HTML 조각 (streamlit_app.py 와 bench.py 에서 공용)
+
+def prediction_box_html(pred: str) -> str:
+    return f"""
+            <div class="prediction-box">
+                <span style="font-size:1.0rem;color:#555;">예측 결과:</span>
+                <h2>{pred}</h2>
+                <div class="helper">오른쪽 패널에서 예측 라벨의 콘텐츠가 표시됩니다.</div>
+            </div>
+            """
+
+def sorted_probs(labels, probs) -> list[tuple[str, float]]:
+    """(라벨, 확률) 목록을 확률 내림차순으로."""
+    return sorted(
+        [(labels[i], float(probs[i])) for i in range(len(labels))],
+        key=lambda x: x[1], reverse=True
+    )
+
+def prob_card_html(lbl: str, p: float, highlight: bool = False) -> str:
+    pct = p * 100
+    hi = "highlight" if highlight else ""
+    return f"""
+                <div class="prob-card">
+                  <div style="display:flex;justify-content:space-between;margin-bottom:6px;">
+                    <strong>{lbl}</strong><span>{pct:.2f}%</span>
+                  </div>
+                  <div class="prob-bar-bg">
+                    <div class="prob-bar-fg {hi}" style="width:{pct:.4f}%;"></div>
+                  </div>
+                </div>
+                """
+
+# 동영상 타임라인: 구간 길이에 비례한 색 띠 (라벨별 고정 색)
+TIMELINE_COLORS = ["#1E88E5", "#FF6F00", "#4CAF50", "#8E24AA", "#E53935", "#00ACC1", "#FDD835", "#6D4C41"]
+
+def fmt_time(sec: float) -> str:
+    return f"{int(sec // 60):02d}:{sec % 60:04.1f}"
+
+def timeline_html(segments: list[dict], vocab: list[str]) -> str:
+    total = (segments[-1]["end"] - segments[0]["start"]) if segments else 0.0
+    if total <= 0: return ""
+    parts = []
+    for seg in segments:
+        w = (seg["end"] - seg["start"]) / total * 100
+        color = TIMELINE_COLORS[vocab.index(seg["label"]) % len(TIMELINE_COLORS)] if seg["label"] in vocab else "#90A4AE"
+        tip = f'{seg["label"]} {fmt_time(seg["start"])}–{fmt_time(seg["end"])} ({seg["confidence"] * 100:.1f}%)'
+        parts.append(f'<div title="{tip}" style="width:{w:.4f}%;background:{color};"></div>')
+    legend = " ".join(
+        f'<span style="color:{TIMELINE_COLORS[i % len(TIMELINE_COLORS)]};">■</span> {lbl}' for i, lbl in enumerate(vocab))
+    return f"""
+                <div class="prob-card">
+                  <div style="display:flex;height:22px;border-radius:6px;overflow:hidden;">{''.join(parts)}</div>
+                  <div class="helper" style="margin-top:6px;">{legend}</div>
+                </div>
+                """
@@ -1,11 +1,18 @@
 # streamlit_py
-import os, re
-from io import BytesIO
-import numpy as np
+import os, time
+import pandas as pd
 import streamlit as st
-from PIL import Image, ImageOps
-from fastai.vision.all import *
-import gdown
+from imaging import PREVIEW_MAX_SIDE, load_pil_from_bytes, make_preview
+from pred_cache import PredictionCache, image_hash, model_identity, pack_prediction
+from batch_infer import iter_uploaded_images, predict_batches
+from backends import artifact_path
+from model_store import ModelEntry, ModelStore, load_in_background, load_manifest
+from infer_worker import InferenceTimeoutError, InferenceWorker, QueueFullError
+from render import fmt_time, prediction_box_html, prob_card_html, sorted_probs, timeline_html
+from metrics import MetricsRegistry
+from video import VIDEO_EXTS, classify_frames, iter_frames, summarize_timeline, video_file, video_info
+from content_store import (IMAGE_CARD_WIDTH, VIDEO_CARD_WIDTH, AssetCache, content_for_label,
+                           load_content_manifest, yt_thumb)
 
 # ======================
 # 페이지/스타일
@@ -37,96 +44,118 @@ st.title("이미지 분류기 (Fastai) — 확률 막대 + 라벨별 고정 콘
 # ======================
 # 세션 상태
 # ======================
-if "img_bytes" not in st.session_state:
-    st.session_state.img_bytes = None
+# 원본 업로드 바이트는 보관하지 않음: 해시 + 축소 미리보기 + 마지막 결과만 유지
+if "img_hash" not in st.session_state:
+    st.session_state.img_hash = None
+if "preview" not in st.session_state:
+    st.session_state.preview = None
+if "last_result" not in st.session_state:
+    st.session_state.last_result = None
 if "last_prediction" not in st.session_state:
     st.session_state.last_prediction = None
 
 # ======================
-# 모델 로드
+# 메트릭 (단계별 시간/횟수/이미지 크기, 프로세스 공유)
 # ======================
-FILE_ID = st.secrets.get("GDRIVE_FILE_ID", "1l14YM0VFtfKbPnTZNSnAMD2TnIn6Phx4")
-MODEL_PATH = st.secrets.get("MODEL_PATH", "model.pkl")
+METRICS_ENABLED = bool(st.secrets.get("METRICS_ENABLED", True))
+METRICS_ADMIN = bool(st.secrets.get("METRICS_ADMIN", False))  # 사이드바 관리자 패널
 
 @st.cache_resource
-def load_model_from_drive(file_id: str, output_path: str):
-    if not os.path.exists(output_path):
-        url = f"https://drive.google.com/uc?id={file_id}"
-        gdown.download(url, output_path, quiet=False)
-    return load_learner(output_path, cpu=True)
+def get_metrics(enabled: bool) -> MetricsRegistry:
+    return MetricsRegistry(enabled=enabled)
 
-with st.spinner("🤖 모델 로드 중..."):
-    learner = load_model_from_drive(FILE_ID, MODEL_PATH)
-st.success("✅ 모델 로드 완료")
-
-labels = [str(x) for x in learner.dls.vocab]
-st.write(f"**분류 가능한 항목:** `{', '.join(labels)}`")
-st.markdown("---")
+metrics = get_metrics(METRICS_ENABLED)
 
 # ======================
-# 라벨 이름 매핑: 여기를 채우세요!
-# 각 라벨당 최대 3개씩 표시됩니다.
+# 모델 로드
 # ======================
-CONTENT_BY_LABEL: dict[str, dict[str, list[str]]] = {
-    # 예)
-    # "짬뽕": {
-    #   "texts": ["짬뽕의 특징과 유래", "국물 맛 포인트", "지역별 스타일 차이"],
-    #   "images": ["https://.../jjampong1.jpg", "https://.../jjampong2.jpg"],
-    #   "videos": ["https://youtu.be/XXXXXXXXXXX"]
-    # },
-
-    labels[0]:{"texts":["타코는 멕시칸 유명 요리이다"],
-              "videos":["https://youtu.be/jFabzMoMERM?si=Xg4sUR_m-w2WM_Vb"],
-              "images":["https://media.istockphoto.com/id/459396345/ko/%EC%82%AC%EC%A7%84/%ED%83%80%EC%BD%94.jpg?s=612x612&w=0&k=20&c=jCegNwXKOV9xcxQXTvxFJu_VH4cl9Ph5YM9z9-QWPMU="]},
-    labels[1]:{"texts":["파스타는 이탈리아 유명 요리이다"],
-            "videos":["https://youtu.be/-G478hXpaEk?si=V8RYcoWSRndMPUSF"],
-              "images":["https://semie.cooking/image/contents/recipe/cv/ru/hwgnaulb/IRD/144082280wkmc.jpg"]},
-    labels[2]:{"texts":["피자는 이탈리아 유명 반죽 요리이다"],
-               "videos":["https://youtu.be/5LsdZ3QTU0w?si=QgqKJAt8_auKrTzi"],
-              "images":["data:image/jpeg;base64,/9j/4AAQSkZJRgABAQAAAQABAAD/2wCEAAkGBxITEhUTExMWFhUXGR0aGBgYGB8bHRofGBcaGBobHyAaHSggHyAlHhgaIjEjJikrLi4uIB8zODMsNyguLysBCgoKDg0OGxAQGzcmICUtMi8yNy4tLystLTArLS0uLTA3Ly41Li8yLzItKy81LS0vMC0vLSstNS0tNS0tLS0vL//AABEIAL4BCgMBIgACEQEDEQH/xAAcAAACAgMBAQAAAAAAAAAAAAAABQQGAgMHAQj/xABAEAABAgQFAgQEAwcCBgIDAAABAhEAAyExBAUSQVEGYRMicYEykaGxQtHwBxQjUmLB4TPxFRZDU3KSgsIXJHP/xAAaAQACAwEBAAAAAAAAAAAAAAAAAwECBAUG/8QALxEAAgIBAwIEBAYDAQAAAAAAAQIAEQMEEiEiMRNBUaEyYZHwQnGBscHRBRTx4f/aAAwDAQACEQMRAD8A7jBBBBCEEEEEIQQQQQhBBBBCEEEEEIQQQQQhBBBBCEEEEEIQQQQQhBBBBCEEEEEIQQQQQhBBBBCEEEEEIQQQQQhBBBBCEEEEEIQQQQQhBBBBCEEEEEIQQQQQhBBGE2alIdSgkcksPrBCZwRF/wCIyf8Auy//AHH5xsw+LlzPgWlf/ioH7RFiTtPeboIqPUPWqZKlS5SNagdJUT5Qq1hVTG4cesU7NM2xs5K/FnKSDVKUOkU28rEj1f6RmyavGnHnNeLRZHF9hL/1D1fhcI6Fr1TdJIlpBJ4qRRNTuXig/wD5HxixpHhJemsJINdgFEgmKjhcN/E9d2pXn7/XmMpctWkKTdza71SOeCfcHgRmyakk96nRw6FFHIs/OWhfVeNly0n94UolThwl2JsKVry32jdhP2lYtBPiJlzAGo2klw9CD3H4dxzFbSiYTLC1eVLhzQ239f71jCZgfKpw60khL1BYX+fvUwlNQR+KObSoe6idJy79pkiYQlciag/iLpUA3cFz6tF1w2ITMSFoUFJNQRHA8lwK1LUZmpSUAFKXZlEkuQLhno/9hFzw+czMKQZawoKqUGv4QQHe/wA6U7jUurr4jYmLLoAeEFGdOginf89JTp1SiQsAoKC+5B1A2s9HhgrrPCBQSTMB/wD5qLfIfURpXUYm5BmFtLmX8P8AMsMEasNiUTE6kKCk8gxth0zkVCCCCCEIIIIIQgggghCCCCCEIIIIIQgggghCCCCCEIIIIIQjBUwAgEgE2c3ir43ruRLmrleHNKkK0kkBKSxYkEmoFf8AYvFB6kVNxWLTNWlK0n4Cf+nprp+5fk+kZsuqRPzmzDo3yHngToHVvVPgJ0SClU03JqlA5PKuB89geeY/NZ8wJTNnFYJ/ETRXLOw+m8NsNgxMQdQSAS1Q2xHY/wC0Is4lCWCCR5FEk71ag37v/mOW2sfIeeBOrp9PiTpHJitWMUhbOQoWqzH++/3fi1ZXikztDf6gd2ZxWigzFPq9XBDRWs1k6kJmoAURpBYg6hu4PDHaopEvpHGst1U1gAdtOoDvYvfc0i5K5Me70/eWcENQEbzCo4hp4YrfzCteac3IG8Mp6ErQElwwDF7s1z67RX88xTnUhyUOR6XI9aO3aGWUYb96AnImAIapIDVDsOafcRhPiZaKjkyduwdRqpqnTKlw9nagoC5Abj+0asRh5SCkkjzebTfSC9Gbd39Ibz8mSlKgDqWAVJq9BxsGJF+0UFWZNtXmHrgdPjP0jsLDN8HlLD+8ygoG9XqDRgPpf6RsxLOZiTqPb6M28V3DzTNOkXOwSVE+jbk0aGcvIlS/NNOkAhw/LXHuP9ok6Rj8Ny2R1xnqbmeDMCkqTUUAJSxU6XZidvMfpGcjB63KlEkMASSXar12s2/yhdmCEmYPBQoa1eUso6xQEg1oaQ/y6QuV8SXYVIVqCbf0ijQ3aUHSIp8gPNxLNxc+XMCdJ0pDAg8kE07sPTzQ2lZgqYhSSBUA2+GjECte9oX4zGGbMJSkJD+Vt+5beJ0nLR4Spi1hkgmit9t7flC2UMKPeOOMqu5vONJeczMOykLKBqdTAMrlwb0Bd697Q3/59mKmJCRKCSaJLqOlw7lNlVt6+sUVRE0hCbBgASXNKk03NnagHpEvB5UQnWE23BqPxcPaKjNkwLtuZm0+JyWYczp2C6vkLICqOWB712uPhMPsPiUTBqQoKHILxwRGPWjUx8qlEl9i4D03OkC/yN7T0vncxIKQsApvWpc8OQ92e7Emxjbj1rL8fI95jzf44VacTq8EVOX1vJSyZoIV/TX6bRIwnWUhZLukAOHBKjsfKBT1cxtXU4mAIM550uUfhlkgiLl2YSp6AuUsKSeNuxBqD2MSocDfaIIINGEEEETIhBBBBCEEEEEIQQRV+res5eCUJZlzFzFJJAAZO4HmNDW7O3yBgkDkyyqWNCQf2hdaqwOmVKQFTVp1ajZAdgWuSWV6NvHO8Tns/EOqdMK9tKi47MlNA/ptzBmap+KUZs7zTCAHCGozaQ1Nz/vC0nRLYg3I4Iag9/y5NOc+oGQkCdzBpRiUHzjnBzJU7+EtACtLSyGABA1EU4hzkEmYEmXMc6BsCWDMLen3oIoWEnTPFSvSKHgtXvsd35MX7D560sq8ZGtKSUjTRR0kgHuX3/8AtCDpg7Ue0nM5A6ZljM1EvySwEK7+a2/G/wB4gYfJ5WISTMxA8RRBVqp5uPiqBQUJPo8VZWYEAzCdSlF3VW/645hllOHmYgErnJQlPJSkhwBqJIKtPwhyDe9DFsQrpUR+TCuNbZq9/v6x/juhwpITJmMQx1GqS7kkpSbH+kfatLU0tS5Tf6S1I9SlRBPuQT7w5xmIXgpwEqcFaarANHdyFByHYCtCCbUIGGaZeFTlrSyysg6QfMolJNRs7Gt4Y4LdNc3KYH8NtzNYI48opkIVNWAgFJ5Gonv8IJYAuTsB83iE4jLkr1JBlKW60lyblzU793FGtEfD4VKCFpVLlpJo66nSbhklmIDEF6UibikqxAWkYqWFLBYFI0q297esJJxEEE8/KXyszEGun5/+S2SswlGTLmAjQRR9mFUt2ikZ302srJkhwWOk0Z+GFD7ND/pDBKkSvDmlK1JcgJJAqokM4BtXvtDifipUwkMSHZhqc13+TwvfYu+3/IhHONjtuU3pufOkFR8AeIUlPiFSkkAgJYhiDVINGq9bCI02X46wlcwatwA7kC55oC/+Yb9dY1UtEsIUUpmFvKT8LOamrk0+cVvBZolAoAKNRvW/rFvEciiePlNeHCMgOQDmW8YrAJKZSpjKSCCVhSE1oRqZhvcgQxxCB4KkzZiUhSSARUgEU7FueGjmmKzITFHU1T8np9In5ROnIAlkEyVFqpoHPcd3Ydz3gcnbaiUyaQpRLffykXGhUpw7gOxBdx+cLcunzJq6qZFyCW1cCgdiRc0i8YnKP3opkyx4clNZk1wWNPIjv3q3uIkZnlUqWBJky/4bVIJFal1KJJJoKmu/pGM9G8j79Zd9SWYIJpy/ATJpMyZORLTQhKEsAxADE7P23iZi54WkIRMCSRdVH9z2cRScaFOULL6SSwBAL2YHYAAD3jGROUpzUgAXNqsL/wBoo6b/AI+ZdNNQDXUt87BhbNpVsSliOOafr1EDEyBh2DJ1EEKU9SAwF77xHwdX8NelmLihNN2HMHVKZipCJ6RZRRMAejH4r1Fqd4hcHlfFyjN4bes3yZ4WsJeuoD1sXPb3iw43EYfCMEp8aYaMGATufTbm0czwatCgSS4AYX2JFwdiT8qUh3KRqD1oH3uab+8XbThW9ZW/EHpHEjqXESF6pKESwa6UhRBJuC6q77AcNHROjesf3v8AhzUeHOAenwqa7cEcH2di3H1YhWsISSQDehrwKN7+kXLpfLlJqCUrA1F2HJcPff8ARh+LM2N68vSZ9Vp8b47rn1nWoIi5biNaAYlR1p5+EEEEEIQQQQQibqbqKXg0JUtKlFZISAwqA9STQOwet7RznGdWT8Z5VykBGsqR5fOEuGD6iAWfzABxxDn9o85JxUtM0eREoqTWhKlMongjQlq7wnk9UYaWGEoilVULesc/UZmZjjWdPT4QqDIRZmmRmMpJCUgILFwAQlTB6m3oafOFeYGVOWUS0nWRTTdi7/UF7WakL89ecozpeoJNCkgMNnFau36eDpVU1BM1CQVhwQGJ0qKXo7u4pe0ZfCG2/P5ToCwbHvGGFwGGlBSZqVS5jVKhpBFnCiAG9eY3JyuQsJOHV5XdQcKB2u9r2aF+OzWfNVWYydgmgLi/enMRP3ZJYgjVSou8UJYnho4YDW5uJYMx6UPlUHUmgYaRT3/zEY5VMfR8F2cgEtwA/N/pCoY7GSHImKKLlCyVBuzny2NmixYdUxkztBIIJCgXF2L6mCfTjeB2yqvHMVt56jfpEkrCISVJmDSpJcK/DQ1NaP8AqwhhhctE+aXMwIcBOs6R5dVhocvUuNvr5ic2RMV8IUaggMAzRgnFEL1KBIGwLEC3FCzCgHrE43AQlruObG7Hp44m3qzCqQUpZKUt5SANJ5oLM+zRXxhQVBcxafQglzya7ULVq0X443Cz5HhaWf8ACsEE8kEOX4tFeldPAkBCpxSbBaBT0IIcd2hTZwh6pGFukq3EW4bNlSpgL638vlL0Dabe4A7m8WnpvqEzZZWwBJIKTQpvsKvQineEOZZJ4BBSsBVCmtvUcUhOtc6XOKkAJTMLlqpCidiQ6QTVvWLqEydY4P0/7IyYwwAHIlwzaScTLEqYnTTUhQHwkE9hQu214rc3pCaogIKHs5XQvwAP7xHUozT/ABNSiOdm7BgPQR7hZYMwAIB9gSHN35t9IYOB0/3GjAV43VHOF/Z6P+pOrbypp8iXiZjsvMjyjGTVj4lFRKghLirKJYkpDANUdo0z8YcOoBBKVkf6ZsxtRy2/faj0YTsPJVKTKWshU7Sty17F6MffjsIQxyIx3Hj74mcqSQSbHlx7yrYjOPhH8RMouUJHlC+VHlzsKV71jHNV3TMWmlGV7Ve47QzzbpFSSdJ8oD6hUX3BtThxSK0rL5rsmvDA/r6xpV1YcGaEXCRujzCSjitS1UUFAa9iSLkC1g5ZrWdjNT0lOUXSEKH9K3/sIzy7BkISiVK1qUBqmLbSOSQ5Ztk3oDesWrL8YmWQ7+alQA7eh9BvaM+d1xMBu48/Oog5nNlB+QiHD5BOl1UEyn31EkUPBMN0LkSZQlqUnTUK1NV3KqG8TcwwJSTMQSVKHl1KDD0dqfl8qRhMEia8yZiEJJNdR8zvWl+aM0UByE1fElFXONzH7/eReoMLJKnkKSwbyvQj+k8bVb5RLwRSpJQksbE0JLn9fWJiBgkhvEMw7MkgfNQ7RqwYlpUVoQ9SWUasK7XveJbeRtBmsKii+f14jnprpoS2UWNX9avxFlxOITLQ/wDDS4valwH9Wik47qmYklKWSx00Dmzu57QjVmkxS3UsqJr5rCt2N+whiY2UW3LTnNifI1k0J2XpHO5S0BBWkLcskkAnhg9aMaRZ44RlhUVhgS5cvQchuKgcR1PpTNpi0ATvi2/K57bvtVnO7S6zxDsbvOfrdEMXUp4lkgggjoTnQggjViZwQhSzZIJPsHghObftTJnz5ciWjUpCSVKH9dQg+mkKvuI51iMuWmhAernf9duI6Th5wDqPmVM8yiTVyXAu/wCVIXdVTkmVZnNC7GpdjVnbau/aOI2rLZOO072FAihKlMlTNADk6UkEUt3aoNOIt6sVh5ctkqeh/pqrtQAPt8gYp8zxShWkOAKghwoW47xlPHjTJZ8MqSWTTzEMGINNRI9RzF7IPE0NjD1Z7ROnNCSQpJIc6SkEsCbHkVh7kSgpbqkrWlizpmJqbF/CLgcUfmHWKy5GFkjSUpCqkVSq1GoTXvzClU+ckiZ4xSGI0lRCagbAj9bRBFNe2XGQuCqHiNpuVzZgYtLSNyAks5Pw1Ltz2ifnmEbD6EF0gAeVNAA2oarF6Df5QoysiY+qYVEAP5iab87s5qQIs+U5lI0rlKDn8Qapq1t73EU6i+5iPeIyIcY4vic8mTQPwk/TvvY14idgcLPVXypA2WX3NGAJHegZ6xas36XluFoWpAN99nsXPNHEIpuQ4gqGhatP8xTp+QqYociB9jcGa01O9LUgfpMMcDKdGtKmZijUAb7LAYg8c32DrJ8+JkjxFpIDsezkMas7m3o9aQsmZErTpUVKNQxVS/a0J8wwXhEJch6lIVTy2JHNT+jFPFxZTtHlI8HevJBJltxedYdXxKLEXAKgefhBB9u8LsYjD4lIlyVgqNeFDceU1A9uIrAJPkTQDk2ibKyBSlMNIIF9Wrio0ud7CpqzsRDFxk8JYkthTELZpmhKx/BmAhbEuzKUAzn2p2LxIwGKRh160DXMTWwe9Ny1WrGcoztKZelMyYFgyytekhkqHxJ1GoLQx6fmqnGZLmSlSp8ogTFUJUpQBUXeoAIAbZmJiC+XGbrn84s5UYbT2/ea8BkS5sxWKxSmVMqRbSkUCEvYNdRv9YZZ3hkTCPMkMGSAQTSzNCzH9SpUFIlFUmlVrSFWLAUJYnloruIlziCXXMf8QOofMUhZ3ZGtzUviwPwbr0llwuPmIOlS1MNyRa5f3pG3Os1MtAmJTKdVEsNyLmgNhFZy/MZyFAhLk31B3+dYfZtgVYlKAFecP5SwOzj2HYe20OFuj2+/SDY9rgvEK86mP51aieSfoxp7Rpl4yrgqSTuk/J9/0I0Y7JJ0tTKSW/mDEfe/6rEVEiY4KWLb1p9I1BVIq5pV8ZHFS74MKTpVPV566Aq5CQ51bUcf1c9luaZUlbzElKCSSU3BLn4eefe/GOFw76EpLFnW73D1GpxuzBvSGUzK5SJaVAqJAoFficWckCveE5jWSl7/AFmRaAu/avWIcJlU/UwQDR/KXcc0J7wzw2XTFpUZa0hQNXQaXrqdjR7hoXYXqKfKUQlkFgliDQAMA1PnE7DZmsgBeluwZvkftFGbKO1ff1j/AAchHymnqXKpaCltWpIAJ2WS9Xtt7fKNOU5EZrnUQ137QxxZRMCggFIZ9LgsW2LBwe9fnDLpxGhACgxuRf7xXJqHGKr5uKKbOSOZEy3ATUTAApJrQ11UBLs9gQDvHRcLin8Cgchy3J394qmZ4Y/GmbpBsdOpj7Cgh1054pmvOF7KAYHjZqisaP8AHteSzMGv68W4S+JtHseCPY7s4UIQ9a5UvE4VUuWvSdSVXbVoL6XHdj6gQ+jxQcNEEWKllYqQROLqWElMhKyhRqpXxVLhqs/r6RPlSEJZOJ86VWUQWDctQbVjz/g6yoJBdSC5NrEoUPpzE3ESAl16gNqkkN6AtHmCDu7ec9KzAgUf7kXH4eT+7kpUAH2fUFPYvVmNPnFby/HKwaipiUGhu4rxvG/MSJy2CyDdgGBZztS/fjmEmNmTAvRNoGIc2ZiBVzvGrDacyNgZdpm7Ns2VPmq0qLKTVJBFGYs9WvXv2hOjBrUsJSFE8ByaVNhFqy7p+SgJWSQsp+LUXJ33PfiJCchmmZqw4dr623HFxS0MGQFu0ujjGKB7Sty8BNbWlCigV1hJa9Ksz2tzEvK0qXMBKgAlisl/gsRvU7ehh1meFxWhJnzxodyHYP8A/LhzvvGiTiMPp0aQsHd2H3qbVvFWClqX3l1zuU59pAzDPpq/4aVq8JLhAo7A0ct+vaFC8Qomq3fcVhtj8jUQNJCnfSzORs/cW/VIGCykIWfG1o3BSDfaoSr5QKoPYxi5caLyPpDDO9FKHJ3+UP8AKwidMCZqSVKYazQ0HFRVi1/XjyVl6FgeAl23KVPRnJCkg33bnvEzLssnHEBa0FKRUE8pcp3q2w9OGiciqg5PMQ2cZBYFSLjunQVaZSw54LAj3sff5RljMXipYTLMtKXVZGlNQLnS2lLA2a7C7HZ1DOUNS06gGOosQRQ2ftCGZiE6WJvUvXalSYVhyuL5+kYuDxlF+XrLTlMqTr1zcRLExI8iNegB2FSbnb37xq/eVDEhegIUAyio0UmpA1MXL2Lt84pisQl3SSO8N8qxatQrqlkstBAISCwce8TkUsLHJkNptlknj6VM+o8uUFrmIAUlRchJH4q0elbs8LMJlWIPnSiakbkHTT+/s8WfD5uErXh5rakF5SxTUk1AI5T8J5YHeJk7ITOacZ+kH0c07fr1igbKOKuQuVQvUaESoVPNSo1/ACE7AAFQAAdqgDvElc2ZpC0JlpVpZwaMLgUow2baEuYZkqXNUkWBZL1LP9bRHxWflXlSnSTcgsDTgWtFxiVhbiz7RnhEEbeBGf8Ax6Zp0KBT3A1Ad6N9o0lcxKQtLzE6viSBU0BcEu3ZveIuFQtnU33cGth84aZDhEusGjJoRcVYt6wFVxC9sswUglTIE3F+VYAPiLoXNn9r/rtG3KVYjzypqSpCgXU76eKAlh22j2dln8UkMoi4f3LufW0MsFjly1VKK38hLdrv2hmXIHSq/iLTAw5EruMwqkuFmqWY1tZvYf2iPLxBDgv2i/TMwwcwtNTsAZqX7UL+Zn5BES8P03JUCtMwqQoOCkpb1dAhF1w0uNV4Y6gRKbgsOUqSpZdJZ70KgKF9wT9IsX7j5XQpruexsO0bc6xUqUkSkAO+zCoruXjdlGZSdISvUmm9R3uHhGQs/biLfKzKGqKZeHWjzqCiixIVY+m4i6ycW/hgUZmagIZre8QE4IpWQtYXJX8I4d2FqcQwwJTMWjwzqSAK8tQ+73jdokbeAZztZlBS/vmXfDnyj0jZGMsMAIyjtziQgggghOe5iPDnYlKidOpS6BmBHie9yY5+cyXiC6T5QagXSCUgfU1MdO62kaZqVH4ZyDLP/kxb3IJHtFMyPpwSlqUXUp2AJYCoctuaCscTUIMeRjXJ7T0GjyKcYaIAFOQH37PUj249hGzEKP4yHSOHvahuB86+rNsahPirIIZLg8uDeCSEjyrYE2fc+gqPpCly2eRNbjjiTskwsmYlEyhUkMAK6T2AoL27CG+d5unDS9YAKyGSBvXftFNEtcpepCmcVep9BELH5muZ4aVoUQCxUA5FgCwO9z7gRpTjlZjbFvyDd2kXHZh4qyuadSjvsOGHyjVicQlQpbfmJcjL5TtNCwCKHSoauLim3y2cxNm5fgCk+HPaZsJgo72fSApxYF+N4BiLfinQ/wBrFjFBT9OJAynqJUlSS+pIuLlu27j6xf8AEZlhkpCyoFSg4SA7jlhatifzjmc/Dq1IAQRR3a9X1U9fpDfB4cUQbDk3J5PaKuqi7FxRwrmYFePylgxPUawGlopepaj9j6QxyjqATJayopBSD5RTagc/3iq42QAoJQorFA+z8C9P8RoRmAUyWIQBTcKIJYqG4t2aEMN1KvEH0ihbHP7y4T8l8WRMUv4pqWKUmzF2TxbeOYYrDzHKNKtQp8Jq2/63pHQpmcTEIcS06Gu/4h23c2HDRDnTv3gkaEJTaoBJNXNRR2anb2MashC17wwPkWyOxlLwuVrKazZaS1JbKUs+wTDvAZUU6ElIepUSXCSLBtzY8hh3jHGzlodFUtQpDCvsI3ox86WlOsAoXUGx7bV9u0Xcs3CivX1jmVx1MbuRc3wyyARWYk6kOL+V9BfkU4duItsnEoWmQpQCF6W8wVR6HetR7RCw+FVP0qSU1BYW2Iup+Pv71vN1TpMxp5ZCiUJrRLAlvQh+bXeJQWKMy5Dbcd/sS+ZvkeDmgeZGvsX7k0Pba8UvE9PtMIGhiWT5gTXazRLRmaUoOltZev8AL/l3+fasRGKJOpS1HgOfzp9Yrkaj0H+powabIB1x0On5klHn0+xrX/xrxEvD5U0pSxQ/EqhHwuw7vGnKM6GoCYAQSwdyQ9g+/Dw7zPGjw1S1JKAaA09b8GFuXcUx4+Xn+szNvxvtrm+Zz2fmC0lQ1eYkueS9TEVExanIBPLC0XH9xw86i1FxsGBanPq0TZXSUhSfLMVT+arfSDep/ObDrtvBFfX+pRsHiACErDAvU1/CW+GorFsyiYpEtbE0IIAo5I2NrbDiGoyXDSgalatuB62DRU8yx6pZKJICQXJLAkk967/37RJG8bR+8S2fxL8/0qTUmUtR8R0qFST5fqbRMXIQpJVLWFf0lTH2f+8VeTJnTASRqVYmodtqU9KRasr6cAQlXmUCWajh7kuRUG9t/dLYlXzuVdh5mo3wMlRwbl1EHyghjpChQh7hjDjovAaLClz6mp+sQpEoJSnDpLj4vY7ex/tF1y3CCWgAR2dFjXbvE4erykkp5XclwQQRumKEEEEEIs6jysYnDrlGhIdJ4UKpPz+jxyrA5wqWpUua4mh01G4p8x9aR2iOc/tL6WK//wBqSPOkecD8QFiO4+3pCc2IZBNOnzeG3yiDLpQQmYSCVhRLbgdvnSEWGxhJWVAag2oNQFRJS7mrhqU77xllmctOBVq0mmoDUQGsQB9hDmfhpSmUkJooE0vxb7GOI+M42O4d530yhuQYqkYaZNqosHFdi/o5O1ufaJs7CiSoOlx7/V4ZY3MTIQ4kgIoxSe3YUrT+8LZWPExBW6gCR892SN6b1t71GSzyOJPU3I4Ed5fivEQPDUUlJq/mI4NYwTlk2cVJZKk3cy06T8qPvbf5Q04UKlhSFFJsFbv71gTmc6UlQE7U+xADMNqb/wCYhFVjwxr0iWVl+Gr+caSMllJTNSkAr0G1ASxFmuHjl2Mx0xExSCCCKkAHh94v2RdRLE0JnD4j5VWL99miZ1NLkFL+AmZOVQBgwfdShQBt4eorhvaWxZ3xubF3KRIWpSKFiR+GpDtV7ORasN8rySawPhsHFVCl7MDqIb0HeJ2WYPDZdLVp/jzWrpFyouwcslI4faxN52V5yqedGgpN2BZIA3oHZvVn5hZDqTQjG1DMtgRlJywaUgqKruTSpu9GA7RTOo568PNXpcfysWptUcafpF+lKEoAhaSmr+ar7NRu1/eKX1tKExWuWDqFFBjWgsz9jQHe+xdUGPMponrIb5EoasWsquSSfUl4dYRWLlgEpZKgGC9NlBx5SaOA9ox6ZnCXMExMjWtJcak6kgixobjg0cAtSLMtfiyy7JSs6mDBJJAIVpS7ks99hffQTjUWTzNeXO5baBa/P+pEyeYoeVNSoOBwTQfb6bi7rNsmMyWUqlFbl60YpBYizEn0oWpEDCYGVJSJhV5lWCjvzYfow6wvU0ooKZhJo2pSaGhpSg9wIyq29rH6TNnJ7gfnOS4aatZVUakFlPT3Y2i29K5eP9SYRV06CHuGCi9KuNN3IJ2jfnWWSZszxZAJU4cPpChuH9LO1RxDDKsLJSnUhSiFAOpRG2xdLgjh40nLjXkiS+TK+PbdSOMINZQipdg1aAirja1aXPEO8yczCqaQEH8JIPyBa140Lx0uSG8xKrAfEWsb6iB87wqxOO8b4AUEAgKLFj31AmxItz6Qt+segi+om4xkqJZMpDD+YsAz3Foa4eXPSAAJbbGpd6c/aKdmGIn6kiWolqnYG4Bo/qG7dxEjLM9ntpWClTB9n7tx6xQ6da3X/MqxZjtj04aYrWCtXJAAA7fJoW4yRKSv4FGlfVrs1om4aao+cl1VYFgDal/9o142T4s1JSKkJIPAINfW7ehhBc3Uego1JHT+ZTA6RLSpwSkkNq07W2Dxow2eKMwygyVFXle13JFtoj5kheGIEpRKlAgAcE0+5Me9J9PKVME2YCVP5AXdN6ke9A1I26XAXYFu0yap8aqWHn2l1yXLFGZ4hF2+j/mYuaY0YCVpQBEiO0qhRQnBZixswgggiZEIIIIIQjGYgEMYygghOX9bdDHUqfhgyjVSLAnkcH7/AHpmAx3mCVghQUAoFwRUXc8gA/W4j6BWkEMYp3VfRMrEedI0zBZQv78iFZcQyLU0YM5xtcqEjFIKPDKva9KgH6faJJy1K5ak0IPwsLHmKnm+UT8MseKklCTRSSQLjg0NBxDzKOpJQDLB77/av3jmPoHHYzpjWL5XMMrngJWg3lnzUs1S3tVuIllpyiGCmAPpZxQfprxvnLwq0lUshjVTEuSQzmtxS45fsx6eny0JWlKXUAFd1AsHFjT6RgGBhmo8TU+cFDkAuVfqLKlS0I0PrLk9gKH5QnE1VAWUeXD32/KLPm2L8bFzZaUAokyhqVYiYshSUgnhAU4rdMJpmBmOgJACplW7KWmgehv+qxrbpbaJGHJvXqmuRMShSSUlW4F3/wA9ofS5AmNM0LSk18lK2HFKEfPtHs3L8NLSoAOrQVbmtAWawdgSafKFsrMpwQyFJQkaqMAzE3qH8oJt+cVILdjL3YsD6xjOlrlqcKcHc0Z3NaEnfnaFuNwyNL+ICAxCQ4peyRepuTvGU3MJs2Upw2ltRH3L+oNP8RAy/DlfxfCUkiv8uztXZwLOHIMWxswB3yCnndSIpU1QIYVo5pa/dqe3NoZSspngAoIVUMdNC4Oo2qzj1YRtlZYo0KVUDlgyGsS7OzNwA4rFiwM9iwSaMyW27fr7RD5Cq8CQ1XFeKyBQSAjzO76g9yTv6neFasuWlkEW3Acjmoqz8vcsaRf8wmKBCU2LqNbs1AfcW5iqZljJhJSCAClyNNAHv5QTzf8AlPaFgtfMjC5YVIsiboTpBBWzcCjs3H2iHLnaVE0SXdqAKUGchtzvzSJmGx85lKWQNL/ivUfCS4JBUKUNom4zLFTU6wGKgC5puHUyS5IBdnrWjxHY8+c0WB3iVGF8RRXLJctq1aXoAwe5alKUavEbErmJmCVMQHSNWouCQ+nyns+9hxFjweEWEhGllMx5q1B+vtDCdkyVIUJxrVqgKDhjf4eantF0Jc2YpsgEQnDMJa5SiUVIVZiKV3Ctm9ompQjEAL0aZiCA53au1f1vvryzBqkYdUsKSoJOp2aoSkWHOmvJJJ7wUY8y2CSxZjxtYUr5e0WDAmk5gRYsx0UhJSgnSCavwEs1Pce/q69Ocq1aJCdSyAHajchz3uW9404aRPxC3UpkbhiBegben0i7dPdMBIACdI35PrGjTaOzuyTDq9WFG1TzFuRZEpS9azrmG6uOwi+ZdlSZdd4lYTBplhgIkR1AAO05DMWNmEEEETKwgggghCCCCCEIIIIIQgggghIeNy5EwEECsc/6g/Z2guqV5D2qn5be0dMgIgkgkT56x2R4rDl9JIH4k1/yPeNGH6jnSlBTOoWP9iNxf6x9A4nLkLuIrObdESZjnQCebH5iKNjVu4jkzss41h8/moUpSaal61AgKClbqNlB92Ow4hynrOSplKQULDgKSxFSCoVYsSAW7Q6zP9nLPoJHrX7RWcb0TiE2SFeh/NoVk02N+4/iNTUsvYxyrrDCzlaiGUkcD6MftEHBZrhpilDWoBRCQEkeQEFwCo2d6tFZxXTM9N5Svk8LpuVEUKG9ozj/AB2MWQTzNCa5gKqdLXisPJkLQhtJqokgUBerUs/6aNeSSUJqiaFJZRSB5S6iCyqvQfLY1L83m4eYU6SpRHBJaIisrHEQNCRfVLnXiqC+867gsMo6v4ydGwUwNmYkHa7gc2tD/CJCTRICDVTswZ6g7ipv8+OGI8ZtHir08aj97xinLfWv19eYg6F/NpD6xW7CdNzPq7AqxCZcufrLsWSooPxE+ayrs7xgvE4eWszlzXDDUGLAD+1D/iOeDLjZj8o3y8nWqmlR+Zi50C+RqUTWsooidHOf4GfLUlJlE6WTpYke4tbeMsnz2WgFMyYVMXAAJKrOTSKRg+lZ1CJRB5Ib7tFgwnSU8/EvT6VP0/OD/RF8GSNau2mEm5p1lpnCZLl+XQRpJYk/hWGfS1X9uIr+JzjFTluKA2SAS+93c1ffcxcMu6GRulSj3oPpX6xa8u6UCbJCR2EPGmx+YuZm1TX08TneV5djFAD/AEwbu5JHDfnFoyjpMFQUU6lbKULegsPWL3hMllo2eGKJYFhDFxIptRFvqMjimMS4LIEpYmph0hAAYRlBDIiEEEEEIQQQQQhBBBBCEEEEEIQQQQQhBBBBCEEEEEIQQQQQnikg3ER5uBlqukRJgghFU3IpZ2iHO6ZQf8xYYIISoTejJZ/Ag/8AxH5RFX0NL/7aP/UReYIJNmUP/kSV/wBpHyjNHREsf9NH/qIvMEELlQldIpH4Uj0AiZK6ZA3ixwQSInldPyxeJkrLZabJiZBBCYJlgWEZwQQQhBBBBCEEEEEIQQQQQhBBBBCEEEEEJ//Z"]
-              },
-
+FILE_ID = st.secrets.get("GDRIVE_FILE_ID", "1l14YM0VFtfKbPnTZNSnAMD2TnIn6Phx4")
+MODEL_PATH = st.secrets.get("MODEL_PATH", "model.pkl")  # 파일명만 사용: models/<버전>/<파일명>
+# fastai | torchscript | torchscript-int8 | onnx | onnx-int8 (export_model.py 로 아티팩트 생성)
+INFER_BACKEND = st.secrets.get("INFER_BACKEND", "fastai")
+
+MODEL_STORE_DIR = st.secrets.get("MODEL_STORE_DIR", "models")
+# 매니페스트(JSON)가 있으면 버전/체크섬을 따르고, 없으면 GDRIVE_FILE_ID 를 하나의 버전으로 취급
+MODEL_MANIFEST = st.secrets.get("MODEL_MANIFEST")
+MODEL_VERSION = st.secrets.get("MODEL_VERSION")
+
+def model_entry() -> ModelEntry:
+    if MODEL_MANIFEST:
+        return load_manifest(MODEL_MANIFEST, MODEL_VERSION)
+    # MODEL_ARTIFACTS: [MODEL_ARTIFACTS.onnx] url/sha256, [MODEL_ARTIFACTS.meta] url/sha256 … (fastai 외 백엔드용)
+    return ModelEntry(version=MODEL_VERSION or "default", url=f"gdrive:{FILE_ID}",
+                      sha256=st.secrets.get("MODEL_SHA256"), filename=os.path.basename(MODEL_PATH),
+                      artifacts={k: dict(v) for k, v in st.secrets.get("MODEL_ARTIFACTS", {}).items()})
+
+# 다운로드/검증 + fastai·torch import + load_learner + warm-up 은 백그라운드 스레드에서.
+# 페이지 뼈대와 업로드 위젯은 그동안 바로 렌더링됨.
+@st.cache_resource
+def start_model_load(version: str, url: str, sha256: str | None, filename: str, artifacts: dict, backend: str):
+    return load_in_background(ModelStore(MODEL_STORE_DIR),
+                              ModelEntry(version, url, sha256, filename, artifacts), backend, metrics=metrics)
+
+MODEL_ENTRY = model_entry()
+model_future = start_model_load(MODEL_ENTRY.version, MODEL_ENTRY.url, MODEL_ENTRY.sha256,
+                                MODEL_ENTRY.filename, MODEL_ENTRY.artifacts, INFER_BACKEND)
+
+def wait_for_model():
+    """백그라운드 로드 결과 (backend, 로컬 경로). 실패하면 다음 실행에서 재시도하도록 캐시를 비움."""
+    try:
+        if not model_future.done():
+            with st.spinner("🤖 모델 로드 중..."):
+                return model_future.result()
+        return model_future.result()
+    except Exception as e:
+        start_model_load.clear()
+        st.error(f"모델 로드 실패: {e}")
+        st.stop()
+
+model_status = st.container()
 
+# ======================
+# 예측 캐시 (모든 세션 공유)
+# ======================
+@st.cache_resource
+def get_pred_cache(maxsize: int, ttl: float) -> PredictionCache:
+    return PredictionCache(maxsize=maxsize, ttl=ttl)
 
-}
+pred_cache = get_pred_cache(int(st.secrets.get("PRED_CACHE_SIZE", 256)),
+                            float(st.secrets.get("PRED_CACHE_TTL", 3600)))
 
 # ======================
-# 유틸
+# 라벨별 콘텐츠: 매니페스트 + 로컬 에셋 캐시
+# 각 라벨당 최대 3개씩 표시됩니다. content/content.json 을 채우세요.
 # ======================
-def load_pil_from_bytes(b: bytes) -> Image.Image:
-    pil = Image.open(BytesIO(b))
-    pil = ImageOps.exif_transpose(pil)
-    if pil.mode != "RGB": pil = pil.convert("RGB")
-    return pil
+CONTENT_MANIFEST = st.secrets.get("CONTENT_MANIFEST", "content/content.json")
 
-def yt_id_from_url(url: str) -> str | None:
-    if not url: return None
-    pats = [r"(?:v=|/)([0-9A-Za-z_-]{11})(?:\?|&|/|$)", r"youtu\.be/([0-9A-Za-z_-]{11})"]
-    for p in pats:
-        m = re.search(p, url)
-        if m: return m.group(1)
-    return None
-
-def yt_thumb(url: str) -> str | None:
-    vid = yt_id_from_url(url)
-    return f"https://img.youtube.com/vi/{vid}/hqdefault.jpg" if vid else None
+@st.cache_resource
+def get_content(manifest_path: str):
+    manifest = load_content_manifest(manifest_path)
+    assets = AssetCache(st.secrets.get("ASSET_CACHE_DIR", ".asset_cache"),
+                        max_bytes=int(st.secrets.get("ASSET_CACHE_MB", 64)) << 20,
+                        base_dir=manifest["base_dir"], mirror_dir=st.secrets.get("ASSET_MIRROR_DIR"))
+    return manifest, assets
 
-def pick_top3(lst):
-    return [x for x in lst if isinstance(x, str) and x.strip()][:3]
+content_manifest, assets = get_content(CONTENT_MANIFEST)
+ASSET_PREFETCH_TOPK = int(st.secrets.get("ASSET_PREFETCH_TOPK", 3))
 
 def get_content_for_label(label: str):
     """라벨명으로 콘텐츠 반환 (texts, images, videos). 없으면 빈 리스트."""
-    cfg = CONTENT_BY_LABEL.get(label, {})
-    return (
-        pick_top3(cfg.get("texts", [])),
-        pick_top3(cfg.get("images", [])),
-        pick_top3(cfg.get("videos", [])),
-    )
+    return content_for_label(content_manifest, label, labels)
 
 # ======================
 # 입력(카메라/업로드)
 # ======================
-tab_cam, tab_file = st.tabs(["📷 카메라로 촬영", "📁 파일 업로드"])
+def secret_option(key: str, options: list, default):
+    """select_slider 기본값: secrets 값을 options 중 가장 가까운 값으로 맞춤 (목록 밖 값이면 위젯이 예외를 냄)."""
+    try:
+        v = float(st.secrets.get(key, default))
+    except (TypeError, ValueError):
+        v = float(default)
+    return min(options, key=lambda o: abs(o - v))
+
+tab_cam, tab_file, tab_batch, tab_video = st.tabs(["📷 카메라로 촬영", "📁 파일 업로드", "📦 여러 장 일괄 분류",
+                                                   "🎬 동영상"])
 new_bytes = None
 
 with tab_cam:
@@ -140,58 +169,211 @@ with tab_file:
     if f is not None:
         new_bytes = f.getvalue()
 
+# 여러 장 / zip: 배치 단위 추론 (fastai 백엔드는 test_dl + get_preds), 배치마다 표 갱신
+with tab_batch:
+    batch_files = st.file_uploader("이미지 여러 장 또는 zip 파일을 업로드하세요",
+                                   type=["jpg","png","jpeg","webp","tiff","zip"],
+                                   accept_multiple_files=True)
+    batch_size = st.select_slider("배치 크기", options=[8, 16, 32, 64, 128],
+                                  value=secret_option("BATCH_SIZE", [8, 16, 32, 64, 128], 32))
+    batch_cols = {"신뢰도": st.column_config.ProgressColumn("신뢰도", format="%.3f",
+                                                         min_value=0.0, max_value=1.0)}
+    table = st.empty()
+    run_batch = bool(batch_files) and st.button("일괄 분류 시작", type="primary")
+
+# 동영상: 프레임 샘플링(일정 간격 또는 장면 전환) → 중복 프레임 제외 → 배치 추론 → 구간 타임라인
+with tab_video:
+    video_f = st.file_uploader(f"동영상을 업로드하세요 ({', '.join(VIDEO_EXTS)})", type=VIDEO_EXTS)
+    vc1, vc2 = st.columns(2)
+    sample_fps = vc1.select_slider("샘플링 (초당 프레임)", options=[0.25, 0.5, 1.0, 2.0, 5.0],
+                                   value=secret_option("VIDEO_SAMPLE_FPS", [0.25, 0.5, 1.0, 2.0, 5.0], 1.0))
+    video_bs = vc1.select_slider("배치 크기 (프레임)", options=[4, 8, 16, 32, 64],
+                                 value=secret_option("VIDEO_BATCH_SIZE", [4, 8, 16, 32, 64], 16))
+    scene_mode = vc2.checkbox("장면 전환 시에만 분류", value=False)
+    scene_threshold = vc2.slider("장면 전환 민감도", 0.1, 0.9, 0.35, 0.05, disabled=not scene_mode,
+                                 help="값이 작을수록 작은 변화도 장면 전환으로 봅니다.")
+    video_status = st.empty()
+    run_video = video_f is not None and st.button("동영상 분석", type="primary")
+
+# ======================
+# 모델 대기
+# ======================
+backend, model_path = wait_for_model()
+
+# 모든 세션이 하나의 워커 큐로 제출 → 짧은 시간창 안의 요청을 묶어 한 번의 forward pass
+# (일괄/동영상 탭은 선택한 배치 크기 그대로 한 번에 처리하되 단건 요청이 먼저)
+# model_path 는 백엔드와 무관하게 같으므로 backend_name 도 캐시 키에 포함
+@st.cache_resource
+def get_infer_worker(_backend, backend_name: str, model_path: str, max_batch: int, max_wait_ms: float,
+                     queue_size: int, torch_threads: int, processes: int) -> InferenceWorker:
+    return InferenceWorker(_backend, max_batch=max_batch, max_wait_ms=max_wait_ms, queue_size=queue_size,
+                           torch_threads=torch_threads or None, processes=processes, model_path=model_path)
+
+model = get_infer_worker(backend, backend.name, model_path,
+                         int(st.secrets.get("INFER_MAX_BATCH", 16)),
+                         float(st.secrets.get("INFER_MAX_WAIT_MS", 10)),
+                         int(st.secrets.get("INFER_QUEUE_SIZE", 256)),
+                         int(st.secrets.get("TORCH_THREADS", 0)),
+                         int(st.secrets.get("INFER_PROCESSES", 0)))
+MODEL_ID = f"{model.name}:{model_identity(artifact_path(model_path, model.name))}"
+# 모델 입력 크기의 2배(미리보기 크기 이상)까지만 디코딩: 큰 원본을 풀해상도로 풀지 않음
+DECODE_SIDE = max(2 * model.input_size, PREVIEW_MAX_SIDE)
+
+labels = model.vocab
+with model_status:
+    st.success(f"✅ 모델 로드 완료 ({model.name}, {MODEL_ENTRY.version})")
+    st.write(f"**분류 가능한 항목:** `{', '.join(labels)}`")
+    st.markdown("---")
+
+# 일괄 분류 실행 (위젯은 위에서 먼저 렌더링, 추론은 모델 로드 후)
+with tab_batch:
+    if run_batch:
+        status = st.empty()
+        rows, t0 = [], time.perf_counter()
+        try:
+            for batch_rows in predict_batches(model, iter_uploaded_images(batch_files),
+                                              bs=batch_size, cache=pred_cache, model_id=MODEL_ID,
+                                              min_side=DECODE_SIDE):
+                rows.extend(batch_rows)
+                assets.prefetch(content_manifest, {r["예측 라벨"] for r in batch_rows if r.get("예측 라벨")}, labels)
+                dt = time.perf_counter() - t0
+                metrics.inc("batch_images_total", len(batch_rows))
+                status.caption(f"{len(rows)}장 처리 · {len(rows)/dt:.1f}장/초")
+                table.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True,
+                                column_config=batch_cols)
+        except InferenceTimeoutError:
+            metrics.inc("inference_timeouts_total")
+            status.warning(f"추론이 지연되어 {len(rows)}장까지만 처리했습니다. 잠시 후 다시 시도하세요.")
+        st.session_state.batch_rows = rows
+        metrics.record_stage("batch_upload", time.perf_counter() - t0)
+    elif st.session_state.get("batch_rows"):
+        table.dataframe(pd.DataFrame(st.session_state.batch_rows), use_container_width=True,
+                        hide_index=True, column_config=batch_cols)
+    if st.session_state.get("batch_rows"):
+        st.download_button("CSV 내보내기",
+                           pd.DataFrame(st.session_state.batch_rows).to_csv(index=False).encode("utf-8-sig"),
+                           file_name="predictions.csv", mime="text/csv")
+
+# 동영상 분석 실행: 프레임은 제너레이터로 흘려 배치마다 워커에 제출 (전체 프레임을 메모리에 두지 않음)
+with tab_video:
+    if run_video:
+        timeline, vstats, t0 = [], {}, time.perf_counter()
+        try:
+            with video_file(video_f.getvalue(), os.path.splitext(video_f.name)[1] or ".mp4") as vpath:
+                info = video_info(vpath)
+                frames = iter_frames(vpath, sample_fps, scene_threshold if scene_mode else None,
+                                     min_side=DECODE_SIDE, stats=vstats)
+                for batch in classify_frames(model, frames, bs=video_bs):
+                    timeline.extend(batch)
+                    total = f" / {fmt_time(info['duration'])}" if info["duration"] else ""
+                    video_status.caption(f"{fmt_time(batch[-1][0])}{total} · "
+                                         f"분류 {vstats['kept']}프레임 · 중복 제외 {vstats['duplicates']}")
+        except ValueError as e:
+            video_status.error(f"동영상을 읽지 못했습니다: {e}")
+        except InferenceTimeoutError:
+            metrics.inc("inference_timeouts_total")
+            video_status.warning("추론이 지연되어 분석을 중단했습니다. 잠시 후 다시 시도하세요.")
+        else:
+            segments, overall = summarize_timeline(timeline, labels, info["duration"])
+            st.session_state.video_result = (segments, overall, dict(vstats), video_f.name)
+            dt = time.perf_counter() - t0
+            metrics.record_stage("video", dt)
+            metrics.inc("video_frames_decoded_total", vstats["decoded"])
+            metrics.inc("video_frames_classified_total", vstats["kept"])
+            video_status.caption(f"{vstats['decoded']}프레임 디코드 · {vstats['kept']}프레임 분류 · "
+                                 f"중복 제외 {vstats['duplicates']} · {dt:.1f}초")
+            assets.prefetch(content_manifest, {seg["label"] for seg in segments}, labels)
+    if st.session_state.get("video_result"):
+        segments, overall, vstats, vname = st.session_state.video_result
+        if not segments:
+            st.info("분류할 프레임이 없습니다.")
+        else:
+            st.markdown(f"**{vname}** 구간별 예측")
+            st.markdown(timeline_html(segments, labels), unsafe_allow_html=True)
+            st.dataframe(pd.DataFrame([{"시작": fmt_time(seg["start"]), "끝": fmt_time(seg["end"]),
+                                        "예측 라벨": seg["label"], "신뢰도": seg["confidence"],
+                                        "프레임": seg["frames"]} for seg in segments]),
+                         use_container_width=True, hide_index=True, column_config=batch_cols)
+            st.markdown("**전체 확률**")
+            ranked = sorted_probs(labels, overall)
+            for lbl, p in ranked:
+                st.markdown(prob_card_html(lbl, p, highlight=(lbl == ranked[0][0])), unsafe_allow_html=True)
+
+pil_img, img_hash, preview = None, st.session_state.img_hash, st.session_state.preview
 if new_bytes:
-    st.session_state.img_bytes = new_bytes
+    h = image_hash(new_bytes)
+    if h != img_hash:
+        with metrics.timer("decode"):
+            pil_img = load_pil_from_bytes(new_bytes, DECODE_SIDE)
+        metrics.observe("input_bytes", len(new_bytes))
+        metrics.observe("decoded_pixels", pil_img.width * pil_img.height)
+        img_hash = h
+        with metrics.timer("preview"):
+            preview = make_preview(pil_img)
 
 # ======================
-# 예측 & 레이아웃
+# 예측
 # ======================
-if st.session_state.img_bytes:
+# 세션 상태(img_hash/preview/last_result)는 결과가 나온 뒤 한꺼번에 갱신:
+# 예측이 실패(st.stop)해도 세션에는 이전 이미지와 그 결과가 짝으로 남음
+result = None
+if img_hash:
+    # 같은 이미지 + 같은 모델이면 재실행(위젯 클릭)마다 forward pass 를 반복하지 않음
+    cache_key = (MODEL_ID, img_hash)
+    result = pred_cache.get(cache_key)
+    metrics.inc("pred_cache_hits_total" if result is not None else "pred_cache_misses_total")
+    if result is None and new_bytes:
+        with st.spinner("🧠 분석 중..."):
+            if pil_img is None:
+                with metrics.timer("decode"):
+                    pil_img = load_pil_from_bytes(new_bytes, DECODE_SIDE)
+            try:
+                with metrics.timer("predict"):
+                    result = pack_prediction(*model.predict(pil_img))
+                metrics.inc("predictions_total")
+            except QueueFullError:
+                metrics.inc("queue_rejections_total")
+                st.warning("지금 요청이 많아 분석 대기열이 가득 찼습니다. 잠시 후 다시 시도하세요.")
+                st.stop()
+            except InferenceTimeoutError:
+                metrics.inc("inference_timeouts_total")
+                st.warning("분석이 지연되고 있습니다. 잠시 후 다시 시도하세요.")
+                st.stop()
+            pred_cache.put(cache_key, result)
+    if result is None and img_hash == st.session_state.img_hash:
+        # 캐시에서 밀려났고 위젯에도 원본이 없으면 세션의 마지막 결과 사용 (같은 이미지일 때만)
+        result = st.session_state.last_result
+    if result is not None:
+        st.session_state.img_hash, st.session_state.preview = img_hash, preview
+        st.session_state.last_result = result
+        st.session_state.last_prediction = result[0]
+
+# ======================
+# 레이아웃
+# ======================
+if result is not None:
     top_l, top_r = st.columns([1, 1], vertical_alignment="center")
 
-    pil_img = load_pil_from_bytes(st.session_state.img_bytes)
     with top_l:
-        st.image(pil_img, caption="입력 이미지", use_container_width=True)
+        st.image(st.session_state.preview, caption="입력 이미지", use_container_width=True)
 
-    with st.spinner("🧠 분석 중..."):
-        pred, pred_idx, probs = learner.predict(PILImage.create(np.array(pil_img)))
-        st.session_state.last_prediction = str(pred)
+    pred, pred_idx, probs = result
+    t_render = time.perf_counter()
+    # 상위 k개 라벨의 이미지/썸네일은 카드를 그리는 동안 백그라운드로 받아둠
+    assets.prefetch(content_manifest, [l for l, _ in sorted_probs(labels, probs)[:ASSET_PREFETCH_TOPK]], labels)
 
     with top_r:
-        st.markdown(
-            f"""
-            <div class="prediction-box">
-                <span style="font-size:1.0rem;color:#555;">예측 결과:</span>
-                <h2>{st.session_state.last_prediction}</h2>
-                <div class="helper">오른쪽 패널에서 예측 라벨의 콘텐츠가 표시됩니다.</div>
-            </div>
-            """, unsafe_allow_html=True
-        )
+        st.markdown(prediction_box_html(st.session_state.last_prediction), unsafe_allow_html=True)
 
     left, right = st.columns([1,1], vertical_alignment="top")
 
     # 왼쪽: 확률 막대
     with left:
         st.subheader("상세 예측 확률")
-        prob_list = sorted(
-            [(labels[i], float(probs[i])) for i in range(len(labels))],
-            key=lambda x: x[1], reverse=True
-        )
+        prob_list = sorted_probs(labels, probs)
         for lbl, p in prob_list:
-            pct = p * 100
-            hi = "highlight" if lbl == st.session_state.last_prediction else ""
-            st.markdown(
-                f"""
-                <div class="prob-card">
-                  <div style="display:flex;justify-content:space-between;margin-bottom:6px;">
-                    <strong>{lbl}</strong><span>{pct:.2f}%</span>
-                  </div>
-                  <div class="prob-bar-bg">
-                    <div class="prob-bar-fg {hi}" style="width:{pct:.4f}%;"></div>
-                  </div>
-                </div>
-                """, unsafe_allow_html=True
-            )
+            st.markdown(prob_card_html(lbl, p, lbl == st.session_state.last_prediction),
+                        unsafe_allow_html=True)
 
     # 오른쪽: 정보 패널 (예측 라벨 기본, 다른 라벨로 바꿔보기 가능)
     with right:
@@ -202,7 +384,7 @@ if st.session_state.img_bytes:
         texts, images, videos = get_content_for_label(info_label)
 
         if not any([texts, images, videos]):
-            st.info(f"라벨 `{info_label}`에 대한 콘텐츠가 아직 없습니다. 코드의 CONTENT_BY_LABEL에 추가하세요.")
+            st.info(f"라벨 `{info_label}`에 대한 콘텐츠가 아직 없습니다. {CONTENT_MANIFEST}에 추가하세요.")
         else:
             # 텍스트
             if texts:
@@ -220,10 +402,11 @@ if st.session_state.img_bytes:
             if images:
                 st.markdown('<div class="info-grid">', unsafe_allow_html=True)
                 for url in images[:3]:
+                    src = assets.data_uri(url, IMAGE_CARD_WIDTH) or url
                     st.markdown(f"""
                     <div class="card" style="grid-column:span 4;">
                       <h4>이미지</h4>
-                      <img src="{url}" class="thumb" />
+                      <img src="{src}" class="thumb" />
                     </div>
                     """, unsafe_allow_html=True)
                 st.markdown('</div>', unsafe_allow_html=True)
@@ -234,6 +417,7 @@ if st.session_state.img_bytes:
                 for v in videos[:3]:
                     thumb = yt_thumb(v)
                     if thumb:
+                        thumb = assets.data_uri(thumb, VIDEO_CARD_WIDTH) or thumb
                         st.markdown(f"""
                         <div class="card" style="grid-column:span 6;">
                           <h4>동영상</h4>
@@ -251,5 +435,32 @@ if st.session_state.img_bytes:
                           <a href="{v}" target="_blank">{v}</a>
                         </div>
                         """, unsafe_allow_html=True)
+    metrics.record_stage("render", time.perf_counter() - t_render)
+elif img_hash:
+    st.info("이전 분석 결과를 찾을 수 없습니다. 이미지를 다시 업로드하세요.")
 else:
     st.info("카메라로 촬영하거나 파일을 업로드하면 분석 결과와 라벨별 콘텐츠가 표시됩니다.")
+
+cs = pred_cache.stats()
+st.sidebar.caption(f"예측 캐시: hit {cs['hits']} / miss {cs['misses']} · {cs['size']}/{cs['maxsize']}개")
+ws = model.stats()
+st.sidebar.caption(f"추론 워커: 대기 {ws['queue']}/{ws['queue_max']} · 일괄 {ws['bulk']} · 평균 배치 {ws['avg_batch']:.1f} · 거절 {ws['rejected']}")
+
+# ======================
+# 메트릭 게이지 / 관리자 패널 / 파일 내보내기
+# ======================
+metrics.gauge("pred_cache_size", cs["size"])
+metrics.gauge("pred_cache_hit_rate", cs["hit_rate"])
+metrics.gauge("worker_queue_depth", ws["queue"])
+metrics.gauge("worker_avg_batch", ws["avg_batch"])
+
+if METRICS_ADMIN and metrics.enabled:
+    with st.sidebar.expander("📊 메트릭 (관리자)"):
+        snap = metrics.snapshot()
+        if snap["histograms"]:
+            st.dataframe(pd.DataFrame.from_dict(snap["histograms"], orient="index"), use_container_width=True)
+        st.json({"counters": snap["counters"], "gauges": snap["gauges"]}, expanded=False)
+        st.download_button("Prometheus 텍스트", metrics.to_prometheus(), file_name="metrics.prom", mime="text/plain")
+        st.download_button("JSON", metrics.to_json(), file_name="metrics.json", mime="application/json")
+
+metrics.maybe_dump(st.secrets.get("METRICS_JSON_PATH"), st.secrets.get("METRICS_PROM_PATH"))
@@ -0,0 +1,33 @@
+# AssetCache.fetch_async: 이미 끝난 Future 의 콜백이 호출 스레드에서 바로 실행돼도 멈추지 않아야 함
+import os, time, threading
+from content_store import AssetCache
+
+CONTENT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "content")
+
+def _call(fn, timeout=5.0):
+    """fn() 을 별도 스레드에서 실행. timeout 안에 끝나지 않으면 실패 (데드락)."""
+    out = {}
+    t = threading.Thread(target=lambda: out.setdefault("v", fn()), daemon=True)
+    t.start()
+    t.join(timeout)
+    assert not t.is_alive(), "fetch_async 가 멈춤 (데드락)"
+    return out["v"]
+
+def test_fetch_async_cached_asset(tmp_path):
+    cache = AssetCache(str(tmp_path / "c"), base_dir=CONTENT_DIR)
+    path = cache.cached("pizza.jpg", 360)
+    assert path and os.path.exists(path)
+    for _ in range(3):
+        fut = _call(lambda: cache.fetch_async("pizza.jpg", 360))
+        assert fut.result(5) == path
+
+def test_fetch_async_missing_source_backs_off(tmp_path):
+    cache = AssetCache(str(tmp_path / "c"), base_dir=str(tmp_path), backoff=60)
+    fut = _call(lambda: cache.fetch_async("missing.jpg", 360))
+    assert isinstance(fut.exception(5), FileNotFoundError)
+    # backoff 동안은 다시 제출하지 않고 실패한 Future 를 그대로 반환
+    assert _call(lambda: cache.fetch_async("missing.jpg", 360)) is fut
+    deadline = time.monotonic() + 5   # 실패 기록은 완료 콜백에서 (set_exception 직후)
+    while ("missing.jpg", 360) not in cache._failures and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert cache._failures[("missing.jpg", 360)][0] == 1
@@ -0,0 +1,129 @@
+# video.py
+# 동영상 분류: OpenCV 디코드 → 프레임 샘플링(일정 fps 또는 장면 전환) → dHash 로 중복 프레임 제외
+# → 배치 추론 → 구간별 라벨 타임라인 + 전체 확률. 프레임은 제너레이터로 흘려보내 긴 영상도 메모리 일정.
+import os, tempfile
+from contextlib import contextmanager
+import numpy as np
+import cv2
+from PIL import Image
+from batch_infer import chunked
+
+VIDEO_EXTS = ["mp4", "mov", "avi", "mkv", "webm", "m4v"]
+
+@contextmanager
+def video_file(data: bytes, suffix: str = ".mp4"):
+    """OpenCV 는 메모리 버퍼를 못 읽으므로 임시 파일로 씀. 블록 종료 시 삭제."""
+    fd, path = tempfile.mkstemp(suffix=suffix)
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data)
+        yield path
+    finally:
+        os.remove(path)
+
+def dhash(frame: np.ndarray, size: int = 8) -> tuple[int, float]:
+    """차이 해시(64비트)와 평균 밝기. 해시는 밝기 변화에 둔감하므로 평균 밝기도 함께 비교."""
+    g = cv2.cvtColor(cv2.resize(frame, (size + 1, size), interpolation=cv2.INTER_AREA), cv2.COLOR_RGB2GRAY)
+    bits = (g[:, 1:] > g[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big"), float(g.mean())
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+def _scene_hist(frame: np.ndarray) -> np.ndarray:
+    small = cv2.resize(frame, (64, 36), interpolation=cv2.INTER_AREA)
+    hsv = cv2.cvtColor(small, cv2.COLOR_RGB2HSV)
+    h = cv2.calcHist([hsv], [0, 1], None, [16, 8], [0, 180, 0, 256])
+    return cv2.normalize(h, h).flatten()
+
+def _shrink(frame: np.ndarray, min_side: int | None) -> np.ndarray:
+    if not min_side: return frame
+    h, w = frame.shape[:2]
+    s = min_side / min(h, w)
+    if s >= 1: return frame
+    return cv2.resize(frame, (round(w * s), round(h * s)), interpolation=cv2.INTER_AREA)
+
+def video_info(path: str) -> dict:
+    cap = cv2.VideoCapture(path)
+    try:
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        # 스트리밍 컨테이너(webm 등)는 프레임 수를 모르면 음수를 돌려줌 → 0 (길이 미상)
+        n = max(int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0), 0)
+        return {"fps": fps, "frames": n, "duration": n / fps if n else 0.0,
+                "width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), "height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))}
+    finally:
+        cap.release()
+
+def iter_frames(path: str, sample_fps: float = 1.0, scene_threshold: float | None = None,
+                dup_bits: int = 4, dup_luma: float = 8.0, min_side: int | None = None,
+                stats: dict | None = None):
+    """(시각(초), RGB 프레임)을 하나씩 yield.
+    scene_threshold 가 없으면 sample_fps 간격으로, 있으면 sample_fps 간격으로 검사해 히스토그램 차이가
+    threshold 이상일 때(장면 전환)만 내보냄. 직전 유지 프레임과 dHash 거리가 dup_bits 이하이고
+    평균 밝기 차이가 dup_luma 미만이면 중복으로 보고 건너뜀."""
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise ValueError("동영상을 열 수 없습니다")
+    stats = stats if stats is not None else {}
+    stats.update(decoded=0, kept=0, duplicates=0)
+    try:
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        step = max(1, round(fps / sample_fps))
+        idx, last_hash, last_hist = -1, None, None
+        while True:
+            # 샘플링하지 않는 프레임은 grab 만 (디코드/색변환 없음)
+            if not cap.grab(): break
+            idx += 1
+            if idx % step: continue
+            ok, bgr = cap.retrieve()
+            if not ok: break
+            stats["decoded"] += 1
+            frame = _shrink(cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB), min_side)
+            if scene_threshold is not None:
+                hist = _scene_hist(frame)
+                if last_hist is not None and \
+                        cv2.compareHist(last_hist, hist, cv2.HISTCMP_BHATTACHARYYA) < scene_threshold:
+                    continue
+                last_hist = hist
+            h, luma = dhash(frame)
+            if last_hash is not None and hamming(h, last_hash[0]) <= dup_bits and abs(luma - last_hash[1]) < dup_luma:
+                stats["duplicates"] += 1
+                continue
+            last_hash = (h, luma)
+            stats["kept"] += 1
+            yield idx / fps, frame
+    finally:
+        cap.release()
+
+def classify_frames(model, frames, bs: int = 16):
+    """(시각, 프레임) 이터러블을 bs 장씩 predict_batch. 배치마다 [(시각, 확률 배열)] yield."""
+    for chunk in chunked(frames, bs):
+        probs = model.predict_batch([Image.fromarray(f) for _, f in chunk], bs)
+        yield [(t, np.asarray(p, dtype=np.float32)) for (t, _), p in zip(chunk, probs)]
+
+def summarize_timeline(timeline, vocab: list[str], duration: float | None = None):
+    """프레임별 (시각, 확률) → 구간 리스트와 전체 확률.
+    각 프레임은 다음 유지 프레임까지의 시간을 대표(중복으로 건너뛴 구간 포함)하며, 그 길이로 가중 평균."""
+    if not timeline:
+        return [], np.zeros(len(vocab), dtype=np.float32)
+    times = [t for t, _ in timeline]
+    end = max(duration or 0.0, times[-1])
+    spans = [(times[i + 1] if i + 1 < len(times) else end) - times[i] for i in range(len(times))]
+    if end == times[-1]:
+        spans[-1] = spans[-2] if len(spans) > 1 else 1.0
+    weights = np.maximum(np.asarray(spans, dtype=np.float32), 1e-3)
+    probs = np.stack([p for _, p in timeline])
+    overall = (probs * weights[:, None]).sum(0) / weights.sum()
+
+    segments = []
+    for (t, p), span in zip(timeline, weights):
+        i = int(np.argmax(p))
+        if segments and segments[-1]["label"] == vocab[i]:
+            seg = segments[-1]
+            seg["end"] = t + float(span)
+            seg["_conf"].append(float(p[i])); seg["frames"] += 1
+        else:
+            segments.append({"start": t, "end": t + float(span), "label": vocab[i], "_conf": [float(p[i])], "frames": 1})
+    for seg in segments:
+        seg["confidence"] = float(np.mean(seg.pop("_conf")))
+    return segments, overall